@@ -1,11 +1,12 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from models import User
+from models import User, Driver, Passenger
 import os
+import time
 
 # Security
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
@@ -15,6 +16,15 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# Authenticated users are cached briefly so a burst of requests with the same
+# token doesn't re-read the user from MongoDB every time. The API never edits
+# an existing user, so there is nothing to invalidate; a change made directly
+# in the database (role, is_active, password) takes up to the TTL to be seen
+# by each worker
+USER_CACHE_TTL_SECONDS = 30
+USER_CACHE_MAX_SIZE = 1024
+_user_cache: Dict[str, Tuple[float, User]] = {}
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -48,12 +58,22 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     return email
 
 async def get_current_user(email: str = Depends(verify_token)):
+    cached = _user_cache.get(email)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    
     user = await User.find_one({"email": email})
     if user is None:
+        _user_cache.pop(email, None)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+    
+    if len(_user_cache) >= USER_CACHE_MAX_SIZE and email not in _user_cache:
+        # Evict the oldest entry (dicts keep insertion order)
+        _user_cache.pop(next(iter(_user_cache)))
+    _user_cache[email] = (time.monotonic() + USER_CACHE_TTL_SECONDS, user)
     return user
 
 async def get_current_admin(current_user: User = Depends(get_current_user)):
@@ -70,4 +90,38 @@ async def get_current_driver(current_user: User = Depends(get_current_user)):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Driver access required"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def get_current_passenger(current_user: User = Depends(get_current_user)):
+    if current_user.role != "passenger":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Passenger access required"
+        )
+    return current_user
+
+# Profile records of the authenticated user, loaded once and kept on
+# request.state so the handler doesn't have to look them up again
+async def get_current_driver_record(request: Request, current_user: User = Depends(get_current_driver)):
+    driver = getattr(request.state, "driver", None)
+    if driver is None:
+        driver = await Driver.find_one({"user_id": current_user.id})
+        if driver is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Driver profile not found"
+            )
+        request.state.driver = driver
+    return driver
+
+async def get_current_passenger_record(request: Request, current_user: User = Depends(get_current_passenger)):
+    passenger = getattr(request.state, "passenger", None)
+    if passenger is None:
+        passenger = await Passenger.find_one({"user_id": current_user.id})
+        if passenger is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Passenger profile not found"
+            )
+        request.state.passenger = passenger
+    return passenger
\ No newline at end of file
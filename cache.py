@@ -0,0 +1,120 @@
+import logging
+import redis.asyncio as redis
+from redis.exceptions import WatchError
+from typing import Optional
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis client (None when Redis is unreachable - caching is then skipped)
+redis_client: Optional[redis.Redis] = None
+
+# Default lifetime of cached debug responses
+DEBUG_CACHE_TTL_SECONDS = 30
+
+# Every key the app caches responses under; writes drop these by name
+DEBUG_CACHE_KEYS = ("debug:data", "debug:users", "debug:drivers", "debug:attendance")
+
+# Bumped on every invalidation so a slow writer can tell its body went stale
+CACHE_GENERATION_KEY = "debug:generation"
+
+async def init_cache():
+    """Initialize Redis connection used for response caching"""
+    global redis_client
+
+    print(f"🔗 Connecting to Redis: {settings.REDIS_URL[:50]}...")
+    try:
+        client = redis.from_url(
+            settings.REDIS_URL,
+            password=settings.REDIS_PASSWORD or None,
+            socket_connect_timeout=2
+        )
+        await client.ping()
+        redis_client = client
+        print("✅ Connected to Redis successfully!")
+    except Exception as e:
+        redis_client = None
+        print(f"⚠️ Redis unavailable, response caching disabled: {e}")
+
+async def close_cache():
+    """Close Redis connection"""
+    global redis_client
+    if redis_client:
+        await redis_client.close()
+        redis_client = None
+        print("✅ Redis connection closed")
+
+async def get_cached(key: str) -> Optional[bytes]:
+    """Get a cached response body, or None on a miss"""
+    if not redis_client:
+        return None
+    try:
+        return await redis_client.get(key)
+    except Exception as e:
+        logger.warning("⚠️ Redis get failed for %s: %s", key, e)
+        return None
+
+async def set_cached(key: str, body: bytes, ttl: int = DEBUG_CACHE_TTL_SECONDS):
+    """Cache a response body for ttl seconds"""
+    if not redis_client:
+        return
+    try:
+        await redis_client.set(key, body, ex=ttl)
+    except Exception as e:
+        logger.warning("⚠️ Redis set failed for %s: %s", key, e)
+
+async def get_cache_generation() -> Optional[bytes]:
+    """Current invalidation generation, or None when it can't be read"""
+    if not redis_client:
+        return None
+    try:
+        return await redis_client.get(CACHE_GENERATION_KEY) or b"0"
+    except Exception as e:
+        logger.warning("⚠️ Redis get failed for %s: %s", CACHE_GENERATION_KEY, e)
+        return None
+
+async def set_cached_if_generation(key: str, body: bytes, generation: Optional[bytes], ttl: int = DEBUG_CACHE_TTL_SECONDS):
+    """Cache a response body only if no invalidation happened since generation
+    was read, so a body built from pre-write data never lands after the DEL"""
+    if not redis_client or generation is None:
+        return
+    try:
+        async with redis_client.pipeline() as pipe:
+            await pipe.watch(CACHE_GENERATION_KEY)
+            if (await pipe.get(CACHE_GENERATION_KEY) or b"0") != generation:
+                return
+            pipe.multi()
+            pipe.set(key, body, ex=ttl)
+            await pipe.execute()
+    except WatchError:
+        # An invalidation raced the write; the body is stale, drop it
+        pass
+    except Exception as e:
+        logger.warning("⚠️ Redis set failed for %s: %s", key, e)
+
+async def invalidate_cache(*keys: str):
+    """Drop the given cached responses (all of DEBUG_CACHE_KEYS by default)
+    with a single DEL, so writes never scan the keyspace, and bump the
+    generation so in-flight cache writes are discarded"""
+    if not redis_client:
+        return
+    keys = keys or DEBUG_CACHE_KEYS
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(*keys)
+            pipe.incr(CACHE_GENERATION_KEY)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("⚠️ Redis invalidation failed for %s: %s", ", ".join(keys), e)
+
+async def invalidate_cache_pattern(pattern: str = "debug:*"):
+    """Drop every cached key matching pattern. This SCANs the whole keyspace,
+    so it is for maintenance only - request handlers use invalidate_cache"""
+    if not redis_client:
+        return
+    try:
+        keys = [key async for key in redis_client.scan_iter(match=pattern)]
+        if keys:
+            await redis_client.delete(*keys)
+    except Exception as e:
+        logger.warning("⚠️ Redis invalidation failed for %s: %s", pattern, e)
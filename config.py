@@ -1,5 +1,7 @@
 import os
+import logging
 from typing import List
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from pathlib import Path
 
@@ -30,11 +32,19 @@ class Settings(BaseSettings):
     # Don't set default here - let it be loaded from .env file
     MONGODB_URL: str = "mongodb://localhost:27017"  # Default fallback
     MONGODB_DATABASE: str = "rideshare"
-    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MAX_POOL_SIZE: int = 200
     MONGODB_MIN_POOL_SIZE: int = 10
-    MONGODB_MAX_IDLE_TIME_MS: int = 30000
+    MONGODB_MAX_IDLE_TIME_MS: int = 300000
     MONGODB_CONNECT_TIMEOUT_MS: int = 20000
     MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGODB_SOCKET_TIMEOUT_MS: int = 30000
+    MONGODB_RETRY_WRITES: bool = True
+    # Wire compression, in order of preference (zstd needs the zstandard
+    # package; the server picks the first one it also supports)
+    MONGODB_COMPRESSORS: str = "zstd,zlib"
+    
+    # Number of server worker processes (set by gunicorn.conf.py / __main__)
+    WEB_CONCURRENCY: int = 1
     
     # Redis (for caching and sessions)
     REDIS_URL: str = "redis://localhost:6379"
@@ -44,7 +54,7 @@ class Settings(BaseSettings):
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_PER_HOUR: int = 1000
     
-    # CORS
+    # CORS - JSON list in the environment, e.g. ALLOWED_ORIGINS='["https://app.example.com"]'
     ALLOWED_ORIGINS: List[str] = ["*"]
     
     # Google Maps API
@@ -66,6 +76,15 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
     
+    @field_validator("LOG_LEVEL")
+    @classmethod
+    def normalize_log_level(cls, value: str) -> str:
+        """Accept any casing (LOG_LEVEL=info) and reject unknown level names"""
+        level = value.strip().upper()
+        if not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"Unknown LOG_LEVEL {value!r}; use DEBUG, INFO, WARNING, ERROR or CRITICAL")
+        return level
+    
     class Config:
         # Look for .env file in current directory
         env_file = str(env_path)
@@ -112,6 +131,14 @@ def get_redis_url():
 settings.MONGODB_URL = get_mongodb_url()
 settings.REDIS_URL = get_redis_url()
 
+# Every worker process opens its own MongoDB pool, so unless the pool sizes
+# were set explicitly, split the single-process budget between the workers
+if settings.WEB_CONCURRENCY > 1:
+    if "MONGODB_MAX_POOL_SIZE" not in settings.model_fields_set:
+        settings.MONGODB_MAX_POOL_SIZE = max(settings.MONGODB_MAX_POOL_SIZE // settings.WEB_CONCURRENCY, 10)
+    if "MONGODB_MIN_POOL_SIZE" not in settings.model_fields_set:
+        settings.MONGODB_MIN_POOL_SIZE = max(settings.MONGODB_MIN_POOL_SIZE // settings.WEB_CONCURRENCY, 1)
+
 # Print current configuration for debugging
 print(f"🔧 Current MongoDB Configuration:")
 print(f"   MONGODB_URL: {settings.MONGODB_URL[:50]}...")
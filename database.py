@@ -7,12 +7,15 @@ from config import settings
 import asyncio
 import ssl
 
-# MongoDB client
+# MongoDB client - created once per process at startup and shared by every
+# request; never construct another one per request
 client: AsyncIOMotorClient = None
 
 async def init_database():
     """Initialize MongoDB connection and Beanie ODM"""
     global client
+    if client is not None:
+        return
     
     # Use settings for MongoDB connection string (which loads from .env file)
     mongodb_url = settings.MONGODB_URL
@@ -24,16 +27,31 @@ async def init_database():
     # Check if this is a local MongoDB connection (no SSL needed)
     is_local_mongodb = "localhost" in mongodb_url or "127.0.0.1" in mongodb_url
     
+    # Keep a warm connection pool so requests don't pay the connect handshake
+    pool_options = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+        "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        # Fail a stuck operation instead of holding its pooled connection forever
+        "socketTimeoutMS": settings.MONGODB_SOCKET_TIMEOUT_MS,
+        "retryWrites": settings.MONGODB_RETRY_WRITES,
+        # Compress documents on the wire; large listings shrink several-fold
+        "compressors": settings.MONGODB_COMPRESSORS,
+    }
+    
     if is_local_mongodb:
         # Local MongoDB - no SSL
         print("🔗 Connecting to local MongoDB...")
-        client = AsyncIOMotorClient(mongodb_url)
+        client = AsyncIOMotorClient(mongodb_url, **pool_options)
     else:
         # MongoDB Atlas - use SSL
         print("☁️ Connecting to MongoDB Atlas...")
         client = AsyncIOMotorClient(
             mongodb_url,
-            tlsCAFile=certifi.where()
+            tlsCAFile=certifi.where(),
+            **pool_options
         )
     
     # Initialize Beanie with the document models
@@ -61,11 +79,38 @@ async def init_database():
         print(f"❌ MongoDB connection failed: {e}")
         raise
 
+    await ensure_unique_email_index()
+    await verify_indexes()
+
+async def ensure_unique_email_index():
+    """Create the unique users.email index, unless duplicate emails already
+    exist - then log them and carry on, since failing here would crash-loop
+    every worker. Re-run after the duplicates are merged (any restart does)"""
+    collection = User.get_motor_collection()
+    duplicates = await collection.aggregate([
+        {"$group": {"_id": "$email", "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ]).to_list(length=None)
+    if duplicates:
+        listed = ", ".join(f"{d['_id']} (x{d['count']})" for d in duplicates[:20])
+        print(f"⚠️ Skipping unique index on users.email, {len(duplicates)} duplicated emails: {listed}")
+        return
+    # Named so it is built next to the older non-unique email_1
+    await collection.create_index([("email", 1)], unique=True, name="email_unique")
+
+async def verify_indexes():
+    """Log the indexes on collections queried by foreign key"""
+    for model in (User, Driver, Passenger, Ride, FuelEntry, DriverAttendance):
+        collection = model.get_motor_collection()
+        indexes = await collection.index_information()
+        print(f"📇 {collection.name} indexes: {', '.join(sorted(indexes))}")
+
 async def close_database():
     """Close MongoDB connection"""
     global client
     if client:
         client.close()
+        client = None
         print("✅ MongoDB connection closed")
 
 async def create_default_users():
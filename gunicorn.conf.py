@@ -0,0 +1,12 @@
+# Gunicorn settings for Railway (loaded automatically from the working directory)
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# A small fixed default: CPU counts inside a container report the host, and
+# each worker opens its own MongoDB pool. Set WEB_CONCURRENCY to change it; the
+# workers inherit it and size their pools to match (see config.py)
+workers = int(os.environ.setdefault("WEB_CONCURRENCY", "2"))
+
+# Uvicorn workers pick uvloop and httptools, both installed by uvicorn[standard]
+worker_class = "uvicorn.workers.UvicornWorker"
@@ -3,48 +3,244 @@ import os
 import sys
 from pathlib import Path
 
-from fastapi import FastAPI, Depends, HTTPException, status, Security, Request
+from fastapi import FastAPI, Depends, HTTPException, Query, status, Security, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime, timedelta, date as dt_date
-from typing import Optional, List
+from typing import Any, AsyncIterator, Optional, List
+import asyncio
 import uuid
 import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+import orjson
+import time
 
 # Import modules
 try:
     from database import init_database, create_default_users, close_database
-    from models import User, Driver, Passenger, Admin, Ride, KilometerEntry, FuelEntry, LeaveRequest, DriverAttendance, RideStatus, LeaveRequestStatus, Vehicle
+    from models import User, Driver, Passenger, Admin, Ride, KilometerEntry, FuelEntry, LeaveRequest, DriverAttendance, RideStatus, LeaveRequestStatus, Vehicle, UserNameView, UserSimpleView, UserSafeView, ProfileUserView, DriverSummaryView, DriverListView, FuelEntryView, AttendanceView, RideSummaryView, RideDetailOut, AttendanceOut
     from config import settings
-    from auth import get_password_hash, verify_password, create_access_token, get_current_user, get_current_admin, get_current_driver
+    from utils import parse_date
+    from schemas import VehicleCreate, AdminFuelEntryCreate, DriverFuelEntryCreate, AttendanceCreate, AttendanceUpdate
+    from cache import init_cache, close_cache, get_cached, set_cached, get_cache_generation, set_cached_if_generation, invalidate_cache
+    from auth import get_password_hash, verify_password, create_access_token, get_current_user, get_current_admin, get_current_driver, get_current_driver_record, get_current_passenger_record
 except ImportError as e:
     print(f"❌ Import error: {e}")
     print(f"🔍 Current working directory: {os.getcwd()}")
     print(f"🔍 Files in current directory: {list(Path('.').glob('*.py'))}")
     raise
 
+# Logging (LOG_LEVEL=INFO in production skips the debug-level diagnostics)
+logging.basicConfig(level=settings.LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+# Handlers write to stdout under a lock; while the app runs, log calls only
+# enqueue the record and a background thread does the actual writing
+_log_listener: Optional[QueueListener] = None
+
+def start_log_listener():
+    """Route root logging through a queue drained by a background thread"""
+    global _log_listener
+    if _log_listener is not None:
+        return
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    log_queue = queue.Queue(-1)
+    _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    _log_listener.start()
+
+def stop_log_listener():
+    """Flush queued records and hand the handlers back to the root logger"""
+    global _log_listener
+    if _log_listener is None:
+        return
+    _log_listener.stop()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+    for handler in _log_listener.handlers:
+        root.addHandler(handler)
+    _log_listener = None
+
+# Accounts created by an admin start with the password "password"; bcrypt is
+# deliberately slow, so hash it once at import instead of on every request
+DEFAULT_PASSWORD_HASH = get_password_hash("password")
+
+# JSON responses are encoded with orjson, which handles datetime/UUID/enum natively
+def dumps_json(content: Any) -> bytes:
+    """Serialize content to JSON bytes, stringifying anything orjson can't encode"""
+    return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+class ORJSONResp(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+def json_ok(data: dict) -> ORJSONResp:
+    """Build a success response directly, skipping FastAPI's jsonable_encoder pass"""
+    return ORJSONResp({"status": "success", **data})
+
+def cached_json(body: bytes) -> Response:
+    """Wrap an already-serialized JSON body, e.g. one served from the cache"""
+    return Response(content=body, media_type="application/json")
+
+# Health probes hit these bodies constantly; they only change once a second
+_timestamped_bodies: dict = {}
+
+def timestamped_json(key: str, content: dict) -> Response:
+    """Serve content plus a UTC timestamp, re-encoding at most once per second"""
+    second = int(time.time())
+    cached = _timestamped_bodies.get(key)
+    if not cached or cached[0] != second:
+        body = dumps_json({**content, "timestamp": datetime.utcnow()})
+        cached = _timestamped_bodies[key] = (second, body)
+    return cached_json(cached[1])
+
+# Sentinel for a cursor that turned out to be empty when prefetched
+_EXHAUSTED = object()
+
+# Appended in place of the missing items when a cursor fails mid-stream
+STREAM_ERROR_MESSAGE = "Response truncated: reading results failed partway through"
+
+async def _prefetched(items: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """Pull the first item before the response starts, so a failing query
+    still surfaces as a normal error response instead of a truncated 200"""
+    iterator = aiter(items)
+    first = await anext(iterator, _EXHAUSTED)
+
+    async def replay():
+        if first is _EXHAUSTED:
+            return
+        yield first
+        async for item in iterator:
+            yield item
+    return replay()
+
+async def _json_array_chunks(items: AsyncIterator[Any], failures: Optional[list] = None) -> AsyncIterator[bytes]:
+    """Encode items as a JSON array. If the cursor fails midway the array is
+    still closed: the error goes into failures when given, otherwise a final
+    {"status": "error"} element marks the array as incomplete"""
+    yield b"["
+    separator = b""
+    try:
+        async for item in items:
+            yield separator + dumps_json(item)
+            separator = b","
+    except Exception as e:
+        logger.error("❌ Streaming response failed midway: %s", e, exc_info=e)
+        if failures is None:
+            yield separator + dumps_json({"status": "error", "message": STREAM_ERROR_MESSAGE})
+        else:
+            failures.append(e)
+    yield b"]"
+
+async def _json_envelope_chunks(key: str, items: AsyncIterator[Any], with_total: bool, failures: Optional[list] = None) -> AsyncIterator[bytes]:
+    # "status" goes last because it is only known once the cursor is drained
+    total = 0
+    failures = [] if failures is None else failures
+
+    async def counted():
+        nonlocal total
+        async for item in items:
+            total += 1
+            yield item
+
+    yield b"{" + dumps_json(key) + b":"
+    async for chunk in _json_array_chunks(counted(), failures):
+        yield chunk
+    if failures:
+        yield b',"status":"error","message":' + dumps_json(STREAM_ERROR_MESSAGE) + b"}"
+        return
+    if with_total:
+        yield b',"total":' + dumps_json(total)
+    yield b',"status":"success"}'
+
+async def stream_json(key: str, items: AsyncIterator[Any], with_total: bool = False) -> StreamingResponse:
+    """Stream {key: [...], "status": "success"} encoding one item at a time, so
+    memory stays flat and the first bytes go out before the cursor is drained.
+    With with_total the item count is added as "total" once the cursor ends.
+    A cursor failing midway ends the body with "status": "error" instead"""
+    items = await _prefetched(items)
+    return StreamingResponse(_json_envelope_chunks(key, items, with_total), media_type="application/json")
+
+async def stream_json_cached(cache_key: str, key: str, items: AsyncIterator[Any], with_total: bool = False) -> StreamingResponse:
+    """Like stream_json, and cache the complete body under cache_key once the
+    last chunk has gone out (nothing is cached if the stream fails midway, or
+    if a write invalidated the cache while it was streaming)"""
+    generation = await get_cache_generation()
+    items = await _prefetched(items)
+
+    async def chunks():
+        body = []
+        failures = []
+        async for chunk in _json_envelope_chunks(key, items, with_total, failures):
+            body.append(chunk)
+            yield chunk
+        if not failures:
+            await set_cached_if_generation(cache_key, b"".join(body), generation)
+    return StreamingResponse(chunks(), media_type="application/json")
+
+async def stream_json_list(items: AsyncIterator[Any]) -> StreamingResponse:
+    """Stream a bare JSON array, one item at a time. A cursor failing midway
+    ends the array with a {"status": "error"} element"""
+    items = await _prefetched(items)
+    return StreamingResponse(_json_array_chunks(items), media_type="application/json")
+
 # Create FastAPI app
-app = FastAPI(title="RideShare API", version="1.0.0")
+app = FastAPI(title="RideShare API", version="1.0.0", default_response_class=ORJSONResp)
 
-# Add CORS middleware
+# Add CORS middleware (set ALLOWED_ORIGINS to the real front-end origins in production)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure this properly for production
+    allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
+# Compress JSON bodies for clients that accept gzip; the listings repeat the
+# same keys on every row, so they shrink several-fold. Small bodies (health
+# probes, single records) aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# The one place unexpected errors are turned into 500s (with their traceback
+# logged); handlers don't wrap themselves in try/except. HTTPExceptions
+# keep going through FastAPI's own handler with their status codes
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    logger.error("❌ Unhandled error on %s %s: %s", request.method, request.url.path, exc, exc_info=exc)
+    return ORJSONResp({"status": "error", "message": str(exc)}, status_code=500)
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
+    start_log_listener()
     await init_database()
-    await create_default_users()
+    await init_cache()
+    try:
+        await create_default_users()
+    except DuplicateKeyError:
+        # Every worker runs startup; the unique email index stops a second
+        # worker from seeding another copy of the default users
+        logger.info("✅ Default users created by another worker")
     print("✅ MongoDB Atlas connected and ready!")
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     await close_database()
+    await close_cache()
+    stop_log_listener()
 
 # Test endpoint
 @app.get("/test")
@@ -55,521 +251,463 @@ async def test_endpoint():
 @app.get("/mobile-test")
 async def mobile_test():
     """Simple test endpoint for mobile app connectivity"""
-    return {
+    return timestamped_json("mobile-test", {
         "status": "success",
         "message": "Mobile app can reach the server!",
-        "timestamp": datetime.utcnow().isoformat(),
         "server": "RecTransport API"
-    }
+    })
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """Health check endpoint for Railway"""
-    return {
+    return timestamped_json("health", {
         "status": "healthy",
-        "message": "RecTransport API is running",
-        "timestamp": datetime.utcnow().isoformat()
-    }
+        "message": "RecTransport API is running"
+    })
 
 # Debug endpoints (no authentication required)
 @app.get("/debug/data")
 async def debug_data():
     """Debug endpoint to check all data without authentication"""
-    try:
-        # Get all users
-        users = await User.find_all().to_list()
-        drivers = await Driver.find_all().to_list()
-        passengers = await Passenger.find_all().to_list()
-        vehicles = await Vehicle.find_all().to_list()
-        
-        return {
-            "status": "success",
-            "data": {
-                "users_count": len(users),
-                "drivers_count": len(drivers),
-                "passengers_count": len(passengers),
-                "vehicles_count": len(vehicles),
-                "users": [{"id": u.id, "name": u.name, "email": u.email, "role": u.role} for u in users],
-                "drivers": [{"id": d.id, "user_id": d.user_id, "vehicle_make": d.vehicle_make, "license_plate": d.license_plate} for d in drivers],
-                "passengers": [{"id": p.id, "user_id": p.user_id} for p in passengers],
-                "vehicles": [{"id": v.id, "vehicle_make": v.vehicle_make, "license_plate": v.license_plate} for v in vehicles]
-            }
+    cached = await get_cached("debug:data")
+    if cached:
+        return cached_json(cached)
+    
+    # Get all users, drivers, passengers and vehicles concurrently
+    users, drivers, passengers, vehicles = await asyncio.gather(
+        User.find_all().to_list(),
+        Driver.find_all().to_list(),
+        Passenger.find_all().to_list(),
+        Vehicle.find_all().to_list()
+    )
+    
+    response = json_ok({
+        "data": {
+            "users_count": len(users),
+            "drivers_count": len(drivers),
+            "passengers_count": len(passengers),
+            "vehicles_count": len(vehicles),
+            "users": [{"id": u.id, "name": u.name, "email": u.email, "role": u.role} for u in users],
+            "drivers": [{"id": d.id, "user_id": d.user_id, "vehicle_make": d.vehicle_make, "license_plate": d.license_plate} for d in drivers],
+            "passengers": [{"id": p.id, "user_id": p.user_id} for p in passengers],
+            "vehicles": [{"id": v.id, "vehicle_make": v.vehicle_make, "license_plate": v.license_plate} for v in vehicles]
         }
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    })
+    await set_cached("debug:data", response.body)
+    return response
 
 @app.get("/debug/users")
 async def debug_users():
     """Get all users without authentication"""
-    try:
-        users = await User.find_all().to_list()
-        return {
-            "status": "success",
-            "users": [
-                {
-                    "id": user.id,
-                    "name": user.name,
-                    "email": user.email,
-                    "phone": user.phone,
-                    "role": user.role,
-                    "created_at": user.created_at.isoformat() if user.created_at else None
-                }
-                for user in users
-            ]
-        }
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    cached = await get_cached("debug:users")
+    if cached:
+        return cached_json(cached)
+    
+    users = await User.find_all().to_list()
+    response = json_ok({
+        "users": [
+            {
+                "id": user.id,
+                "name": user.name,
+                "email": user.email,
+                "phone": user.phone,
+                "role": user.role,
+                "created_at": user.created_at
+            }
+            for user in users
+        ]
+    })
+    await set_cached("debug:users", response.body)
+    return response
 
 @app.get("/debug/users-simple")
 async def debug_users_simple():
     """Get all users in simple format without authentication"""
-    try:
-        users = await User.find_all().to_list()
-        return {
-            "status": "success",
-            "users": [
-                {
-                    "id": user.id,
-                    "name": user.name,
-                    "email": user.email,
-                    "phone": user.phone,
-                    "role": user.role
-                }
-                for user in users
-            ]
-        }
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    users = await User.find_all().project(UserSimpleView).to_list()
+    return {
+        "status": "success",
+        "users": [
+            {
+                "id": user.id,
+                "name": user.name,
+                "email": user.email,
+                "phone": user.phone,
+                "role": user.role
+            }
+            for user in users
+        ]
+    }
 
 @app.get("/debug/drivers")
 async def debug_drivers():
     """Get all drivers without authentication (for testing)"""
-    try:
-        print("🔍 Debug: Fetching all drivers...")
-        drivers = await Driver.find_all().to_list()
+    cached = await get_cached("debug:drivers")
+    if cached:
+        return cached_json(cached)
+    
+    logger.debug("🔍 Debug: Fetching all drivers...")
+    drivers = await Driver.find_all().project(DriverListView).to_list()
+    
+    # Get user info for all drivers in a single query
+    user_ids = [driver.user_id for driver in drivers]
+    users = {u.id: u for u in await User.find({"_id": {"$in": user_ids}}).project(UserSimpleView).to_list()}
+    
+    driver_list = []
+    for driver in drivers:
+        try:
+            user = users.get(driver.user_id)
+            driver_data = {
+                "id": driver.id,
+                "user_id": driver.user_id,
+                "user_name": user.name if user else "Unknown",
+                "user_email": user.email if user else "Unknown",
+                "user_phone": user.phone if user else "Unknown",
+                "vehicle_make": driver.vehicle_make,
+                "vehicle_model": driver.vehicle_model,
+                "vehicle_year": driver.vehicle_year,
+                "license_plate": driver.license_plate,
+                "vehicle_color": driver.vehicle_color,
+                "license_number": driver.license_number,
+                "license_expiry": driver.license_expiry,
+                "rating": driver.rating,
+                "total_rides": driver.total_rides,
+                "current_km_reading": driver.current_km_reading,
+                "is_online": driver.is_online,
+                "created_at": driver.created_at,
+                "updated_at": driver.updated_at
+            }
+            
+            driver_list.append(driver_data)
+        except Exception as e:
+            logger.error("❌ Error processing driver %s: %s", driver.id, e)
+            continue
+    
+    logger.debug("✅ Debug: Found %s drivers", len(driver_list))
+    
+    # Log online status summary
+    online_count = sum(1 for driver in driver_list if driver.get("is_online", False))
+    offline_count = len(driver_list) - online_count
+    logger.debug("📊 Online drivers: %s, Offline drivers: %s", online_count, offline_count)
+    
+    response = json_ok({"drivers": driver_list})
+    await set_cached("debug:drivers", response.body)
+    return response
+
+@app.get("/debug/vehicles")
+async def debug_vehicles():
+    """Get all vehicles without authentication (for testing)"""
+    logger.debug("🔍 Debug: Fetching all vehicles...")
+    
+    # Get vehicles created directly and the drivers' vehicles concurrently
+    vehicles, drivers = await asyncio.gather(
+        Vehicle.find_all().to_list(),
+        Driver.find_all().project(DriverListView).to_list()
+    )
+    vehicle_list = []
+    
+    for vehicle in vehicles:
+        vehicle_data = {
+            "id": vehicle.id,
+            "vehicle_make": vehicle.vehicle_make,
+            "vehicle_model": vehicle.vehicle_model,
+            "vehicle_year": vehicle.vehicle_year,
+            "license_plate": vehicle.license_plate,
+            "vehicle_color": vehicle.vehicle_color,
+            "license_number": vehicle.license_number,
+            "license_expiry": vehicle.license_expiry,
+            "created_at": vehicle.created_at,
+            "updated_at": vehicle.updated_at
+        }
         
-        # Get user info for each driver
-        driver_list = []
-        for driver in drivers:
+        vehicle_list.append(vehicle_data)
+    
+    # Add vehicles from drivers
+    user_ids = [driver.user_id for driver in drivers]
+    users = {u.id: u for u in await User.find({"_id": {"$in": user_ids}}).project(UserSimpleView).to_list()}
+    for driver in drivers:
+        if (driver.vehicle_make and driver.vehicle_model and 
+            driver.license_plate and driver.vehicle_color):
             try:
-                user = await User.get(driver.user_id)
-                driver_data = {
-                    "id": str(driver.id),
-                    "user_id": str(driver.user_id),
-                    "user_name": user.name if user else "Unknown",
-                    "user_email": user.email if user else "Unknown",
-                    "user_phone": user.phone if user else "Unknown",
+                user = users.get(driver.user_id)
+                vehicle_data = {
+                    "id": f"driver_{driver.id}",
+                    "driver_id": driver.id,
+                    "driver_name": user.name if user else "Unknown",
                     "vehicle_make": driver.vehicle_make,
                     "vehicle_model": driver.vehicle_model,
                     "vehicle_year": driver.vehicle_year,
                     "license_plate": driver.license_plate,
                     "vehicle_color": driver.vehicle_color,
                     "license_number": driver.license_number,
-                    "license_expiry": driver.license_expiry.isoformat() if driver.license_expiry else None,
-                    "rating": driver.rating,
-                    "total_rides": driver.total_rides,
-                    "current_km_reading": driver.current_km_reading,
-                    "is_online": driver.is_online,
-                    "created_at": getattr(driver, 'created_at', None),
-                    "updated_at": getattr(driver, 'updated_at', None)
+                    "license_expiry": driver.license_expiry,
+                    "created_at": driver.created_at,
+                    "updated_at": driver.updated_at
                 }
                 
-                # Convert datetime objects to ISO format if they exist
-                if driver_data["created_at"]:
-                    driver_data["created_at"] = driver_data["created_at"].isoformat()
-                if driver_data["updated_at"]:
-                    driver_data["updated_at"] = driver_data["updated_at"].isoformat()
-                
-                driver_list.append(driver_data)
+                vehicle_list.append(vehicle_data)
             except Exception as e:
-                print(f"❌ Error processing driver {driver.id}: {e}")
+                logger.error("❌ Error processing driver vehicle %s: %s", driver.id, e)
                 continue
-        
-        print(f"✅ Debug: Found {len(driver_list)} drivers")
-        
-        # Log online status summary
-        online_count = sum(1 for driver in driver_list if driver.get("is_online", False))
-        offline_count = len(driver_list) - online_count
-        print(f"📊 Online drivers: {online_count}, Offline drivers: {offline_count}")
-        
-        return {"status": "success", "drivers": driver_list}
-    except Exception as e:
-        print(f"❌ Debug: Error fetching drivers: {e}")
-        return {"status": "error", "message": str(e)}
-
-@app.get("/debug/vehicles")
-async def debug_vehicles():
-    """Get all vehicles without authentication (for testing)"""
-    try:
-        print("🔍 Debug: Fetching all vehicles...")
-        
-        # Get vehicles created directly
-        vehicles = await Vehicle.find_all().to_list()
-        vehicle_list = []
-        
-        for vehicle in vehicles:
-            vehicle_data = {
-                "id": str(vehicle.id),
-                "vehicle_make": vehicle.vehicle_make,
-                "vehicle_model": vehicle.vehicle_model,
-                "vehicle_year": vehicle.vehicle_year,
-                "license_plate": vehicle.license_plate,
-                "vehicle_color": vehicle.vehicle_color,
-                "license_number": vehicle.license_number,
-                "license_expiry": vehicle.license_expiry.isoformat() if vehicle.license_expiry else None,
-                "created_at": getattr(vehicle, 'created_at', None),
-                "updated_at": getattr(vehicle, 'updated_at', None)
-            }
-            
-            # Convert datetime objects to ISO format if they exist
-            if vehicle_data["created_at"]:
-                vehicle_data["created_at"] = vehicle_data["created_at"].isoformat()
-            if vehicle_data["updated_at"]:
-                vehicle_data["updated_at"] = vehicle_data["updated_at"].isoformat()
-            
-            vehicle_list.append(vehicle_data)
-        
-        # Get vehicles from drivers
-        drivers = await Driver.find_all().to_list()
-        for driver in drivers:
-            if (driver.vehicle_make and driver.vehicle_model and 
-                driver.license_plate and driver.vehicle_color):
-                try:
-                    user = await User.get(driver.user_id)
-                    vehicle_data = {
-                        "id": f"driver_{str(driver.id)}",
-                        "driver_id": str(driver.id),
-                        "driver_name": user.name if user else "Unknown",
-                        "vehicle_make": driver.vehicle_make,
-                        "vehicle_model": driver.vehicle_model,
-                        "vehicle_year": driver.vehicle_year,
-                        "license_plate": driver.license_plate,
-                        "vehicle_color": driver.vehicle_color,
-                        "license_number": driver.license_number,
-                        "license_expiry": driver.license_expiry.isoformat() if driver.license_expiry else None,
-                        "created_at": getattr(driver, 'created_at', None),
-                        "updated_at": getattr(driver, 'updated_at', None)
-                    }
-                    
-                    # Convert datetime objects to ISO format if they exist
-                    if vehicle_data["created_at"]:
-                        vehicle_data["created_at"] = vehicle_data["created_at"].isoformat()
-                    if vehicle_data["updated_at"]:
-                        vehicle_data["updated_at"] = vehicle_data["updated_at"].isoformat()
-                    
-                    vehicle_list.append(vehicle_data)
-                except Exception as e:
-                    print(f"❌ Error processing driver vehicle {driver.id}: {e}")
-                    continue
-        
-        print(f"✅ Debug: Found {len(vehicle_list)} vehicles")
-        return {"status": "success", "vehicles": vehicle_list}
-    except Exception as e:
-        print(f"❌ Debug: Error fetching vehicles: {e}")
-        return {"status": "error", "message": str(e)}
+    
+    logger.debug("✅ Debug: Found %s vehicles", len(vehicle_list))
+    return json_ok({"vehicles": vehicle_list})
 
 @app.get("/debug/rides")
 async def debug_rides():
     """Get all rides without authentication (for testing)"""
-    try:
-        print("🔍 Debug: Fetching all rides...")
-        rides = await Ride.find_all().to_list()
-        
-        print(f"✅ Debug: Found {len(rides)} rides")
-        
-        ride_list = []
-        for ride in rides:
-            ride_data = {
-                "id": str(ride.id),
-                "passenger_id": ride.passenger_id,
-                "driver_id": ride.driver_id,
-                "status": ride.status,
-                "pickup_address": ride.pickup_address,
-                "dropoff_address": ride.dropoff_address,
-                "requested_at": ride.requested_at.isoformat() if ride.requested_at else None,
-                "assigned_at": ride.assigned_at.isoformat() if ride.assigned_at else None,
-                "picked_up_at": ride.picked_up_at.isoformat() if ride.picked_up_at else None,
-                "completed_at": ride.completed_at.isoformat() if ride.completed_at else None,
-                "distance": ride.distance,
-                "start_km": ride.start_km,
-                "end_km": ride.end_km
-            }
-            ride_list.append(ride_data)
-        
-        return {"status": "success", "rides": ride_list}
-    except Exception as e:
-        print(f"❌ Debug: Error fetching rides: {e}")
-        return {"status": "error", "message": str(e)}
+    logger.debug("🔍 Debug: Streaming all rides...")
+    
+    # Rides are pulled from the cursor and encoded one by one
+    ride_list = (
+        {
+            "id": ride.id,
+            "passenger_id": ride.passenger_id,
+            "driver_id": ride.driver_id,
+            "status": ride.status,
+            "pickup_address": ride.pickup_address,
+            "dropoff_address": ride.dropoff_address,
+            "requested_at": ride.requested_at,
+            "assigned_at": ride.assigned_at,
+            "picked_up_at": ride.picked_up_at,
+            "completed_at": ride.completed_at,
+            "distance": ride.distance,
+            "start_km": ride.start_km,
+            "end_km": ride.end_km
+        }
+        async for ride in Ride.find_all()
+    )
+    
+    return await stream_json("rides", ride_list)
 
 @app.get("/debug/fuel-entries")
 async def debug_fuel_entries():
     """Get all fuel entries without authentication (for testing)"""
-    try:
-        print("🔍 Debug: Fetching all fuel entries...")
-        fuel_entries = await FuelEntry.find_all().to_list()
-        
-        # First, let's see what drivers exist
-        print("🔍 Debug: Checking what drivers exist...")
-        all_drivers = await Driver.find_all().to_list()
-        print(f"🔍 Debug: Found {len(all_drivers)} drivers:")
-        for driver in all_drivers:
-            print(f"  - Driver ID: {driver.id}, User ID: {driver.user_id}")
-        
-        # Get unique driver IDs from fuel entries
-        fuel_driver_ids = set([entry.driver_id for entry in fuel_entries])
-        print(f"🔍 Debug: Fuel entries reference these driver IDs: {fuel_driver_ids}")
-        
-        # Check which driver IDs exist
-        existing_driver_ids = set([driver.id for driver in all_drivers])
-        missing_driver_ids = fuel_driver_ids - existing_driver_ids
-        print(f"🔍 Debug: Missing driver IDs: {missing_driver_ids}")
-        
-        # Get driver info for each fuel entry
-        fuel_list = []
-        
-        # First, get all available drivers to use as fallback
-        all_drivers = await Driver.find_all().to_list()
-        default_driver = all_drivers[0] if all_drivers else None
-        default_user = None
-        if default_driver:
-            default_user = await User.find_one({"_id": default_driver.user_id})
-        
-        print(f"🔍 Debug: Found {len(all_drivers)} drivers, using default: {default_driver.id if default_driver else 'None'}")
-        
-        for entry in fuel_entries:
-            try:
-                print(f"🔍 Debug: Processing fuel entry {entry.id} with driver_id: {entry.driver_id}")
-                
-                driver = await Driver.find_one({"_id": entry.driver_id})
-                print(f"🔍 Debug: Found driver: {driver.id if driver else 'None'}")
-                
-                user = None
-                if driver:
-                    user = await User.find_one({"_id": driver.user_id})
-                    print(f"🔍 Debug: Found user: {user.name if user else 'None'}")
-                else:
-                    # If driver not found, use default driver
-                    driver = default_driver
-                    user = default_user
-                    print(f"🔍 Debug: Using default driver: {driver.id if driver else 'None'}")
-                
-                fuel_data = {
-                    "id": str(entry.id),
-                    "driver_id": str(entry.driver_id),
-                    "driver_name": user.name if user else "Unknown",
-                    "vehicle_make": driver.vehicle_make if driver else "Unknown",
-                    "license_plate": driver.license_plate if driver else "Unknown",
-                    "fuel_amount": entry.amount,
-                    "fuel_cost": entry.cost,
-                    "fuel_station": entry.location,
-                    "date": entry.date.isoformat() if entry.date else None
-                }
-                fuel_list.append(fuel_data)
-            except Exception as e:
-                print(f"❌ Error processing fuel entry {entry.id}: {e}")
-                continue
-        
-        print(f"✅ Debug: Found {len(fuel_list)} fuel entries")
-        return {"status": "success", "fuel_entries": fuel_list}
-    except Exception as e:
-        print(f"❌ Debug: Error fetching fuel entries: {e}")
-        return {"status": "error", "message": str(e)}
+    logger.debug("🔍 Debug: Fetching all fuel entries...")
+    # Load every driver once (only the fields used below) alongside the
+    # entries; this single query serves the diagnostics, the fallback
+    # driver and the per-entry lookup
+    fuel_entries, all_drivers = await asyncio.gather(
+        FuelEntry.find_all().project(FuelEntryView).to_list(),
+        Driver.find_all().project(DriverSummaryView).to_list()
+    )
+    drivers_by_id = {driver.id: driver for driver in all_drivers}
+    logger.debug("🔍 Debug: Found %s drivers:", len(all_drivers))
+    for driver in all_drivers:
+        logger.debug("  - Driver ID: %s, User ID: %s", driver.id, driver.user_id)
+    
+    # Get unique driver IDs from fuel entries
+    fuel_driver_ids = set([entry.driver_id for entry in fuel_entries])
+    logger.debug("🔍 Debug: Fuel entries reference these driver IDs: %s", fuel_driver_ids)
+    
+    # Check which driver IDs exist
+    missing_driver_ids = fuel_driver_ids - drivers_by_id.keys()
+    logger.debug("🔍 Debug: Missing driver IDs: %s", missing_driver_ids)
+    
+    # Use the first available driver as fallback for entries with unknown drivers
+    default_driver = all_drivers[0] if all_drivers else None
+    logger.debug("🔍 Debug: Found %s drivers, using default: %s", len(all_drivers), default_driver.id if default_driver else 'None')
+    
+    # Fetch the users of the referenced drivers in one batched query
+    user_ids = [drivers_by_id[driver_id].user_id for driver_id in fuel_driver_ids if driver_id in drivers_by_id]
+    if default_driver:
+        user_ids.append(default_driver.user_id)
+    users_by_id = {u.id: u for u in await User.find({"_id": {"$in": user_ids}}).project(UserNameView).to_list()}
+    default_user = users_by_id.get(default_driver.user_id) if default_driver else None
+    
+    # Get driver info for each fuel entry
+    fuel_list = []
+    for entry in fuel_entries:
+        try:
+            logger.debug("🔍 Debug: Processing fuel entry %s with driver_id: %s", entry.id, entry.driver_id)
+            
+            driver = drivers_by_id.get(entry.driver_id)
+            logger.debug("🔍 Debug: Found driver: %s", driver.id if driver else 'None')
+            
+            user = None
+            if driver:
+                user = users_by_id.get(driver.user_id)
+                logger.debug("🔍 Debug: Found user: %s", user.name if user else 'None')
+            else:
+                # If driver not found, use default driver
+                driver = default_driver
+                user = default_user
+                logger.debug("🔍 Debug: Using default driver: %s", driver.id if driver else 'None')
+            
+            fuel_data = {
+                "id": entry.id,
+                "driver_id": entry.driver_id,
+                "driver_name": user.name if user else "Unknown",
+                "vehicle_make": driver.vehicle_make if driver else "Unknown",
+                "license_plate": driver.license_plate if driver else "Unknown",
+                "fuel_amount": entry.amount,
+                "fuel_cost": entry.cost,
+                "fuel_station": entry.location,
+                "date": entry.date
+            }
+            fuel_list.append(fuel_data)
+        except Exception as e:
+            logger.error("❌ Error processing fuel entry %s: %s", entry.id, e)
+            continue
+    
+    logger.debug("✅ Debug: Found %s fuel entries", len(fuel_list))
+    return json_ok({"fuel_entries": fuel_list})
 
 @app.post("/debug/fix-fuel-entries")
 async def fix_fuel_entries():
     """Fix fuel entries by assigning them to valid drivers"""
-    try:
-        print("🔧 Debug: Starting fuel entries fix...")
-        
-        # Get all drivers
-        all_drivers = await Driver.find_all().to_list()
-        if not all_drivers:
-            return {"status": "error", "message": "No drivers found in database"}
-        
-        # Get all fuel entries
-        fuel_entries = await FuelEntry.find_all().to_list()
-        if not fuel_entries:
-            return {"status": "error", "message": "No fuel entries found"}
-        
-        print(f"🔧 Debug: Found {len(all_drivers)} drivers and {len(fuel_entries)} fuel entries")
-        
-        # Get the first driver ID to use as default
-        default_driver_id = all_drivers[0].id
-        print(f"🔧 Debug: Using default driver ID: {default_driver_id}")
-        
-        # Fix each fuel entry
-        fixed_count = 0
-        for entry in fuel_entries:
-            try:
-                # Check if the current driver_id exists
-                driver_exists = await Driver.find_one({"_id": entry.driver_id})
-                
-                if not driver_exists:
-                    print(f"🔧 Debug: Fixing fuel entry {entry.id} - assigning to driver {default_driver_id}")
-                    # Update the fuel entry with a valid driver ID
-                    entry.driver_id = default_driver_id
-                    await entry.save()
-                    fixed_count += 1
-                else:
-                    print(f"🔧 Debug: Fuel entry {entry.id} already has valid driver {entry.driver_id}")
-                    
-            except Exception as e:
-                print(f"❌ Error fixing fuel entry {entry.id}: {e}")
-                continue
-        
-        print(f"✅ Debug: Fixed {fixed_count} fuel entries")
-        return {
-            "status": "success", 
-            "message": f"Fixed {fixed_count} fuel entries",
-            "fixed_count": fixed_count,
-            "total_entries": len(fuel_entries)
-        }
-        
-    except Exception as e:
-        print(f"❌ Debug: Error fixing fuel entries: {e}")
-        return {"status": "error", "message": str(e)}
+    logger.debug("🔧 Debug: Starting fuel entries fix...")
+    
+    # Get all drivers
+    all_drivers = await Driver.find_all().project(DriverSummaryView).to_list()
+    if not all_drivers:
+        return {"status": "error", "message": "No drivers found in database"}
+    
+    # Count fuel entries
+    total_entries = await FuelEntry.find_all().count()
+    if not total_entries:
+        return {"status": "error", "message": "No fuel entries found"}
+    
+    logger.debug("🔧 Debug: Found %s drivers and %s fuel entries", len(all_drivers), total_entries)
+    
+    # Get the first driver ID to use as default
+    default_driver_id = all_drivers[0].id
+    logger.debug("🔧 Debug: Using default driver ID: %s", default_driver_id)
+    
+    # Reassign every entry whose driver no longer exists in one server-side update
+    valid_driver_ids = [driver.id for driver in all_drivers]
+    result = await FuelEntry.find({"driver_id": {"$nin": valid_driver_ids}}).update_many(
+        {"$set": {"driver_id": default_driver_id}}
+    )
+    fixed_count = result.modified_count if result else 0
+    
+    logger.debug("✅ Debug: Fixed %s fuel entries", fixed_count)
+    await invalidate_cache()
+    return {
+        "status": "success", 
+        "message": f"Fixed {fixed_count} fuel entries",
+        "fixed_count": fixed_count,
+        "total_entries": total_entries
+    }
+
+# Fields returned by the ride detail endpoints (see RideDetailOut)
+_RIDE_DETAIL_FIELDS = [
+    "passenger_id", "driver_id", "status",
+    "pickup_latitude", "pickup_longitude", "pickup_address",
+    "dropoff_latitude", "dropoff_longitude", "dropoff_address",
+    "requested_at", "assigned_at", "picked_up_at", "completed_at",
+    "distance", "start_km", "end_km"
+]
+_USER_DETAIL_FIELDS = ["name", "email", "phone", "role", "avatar", "created_at", "is_active"]
+
+# Joins each ride with its passenger, driver and their users in one round-trip
+RIDE_PEOPLE_STAGES = [
+    {"$lookup": {"from": "passengers", "localField": "passenger_id", "foreignField": "_id", "as": "passenger"}},
+    {"$lookup": {"from": "drivers", "localField": "driver_id", "foreignField": "_id", "as": "driver"}},
+    {"$addFields": {
+        "passenger": {"$arrayElemAt": ["$passenger", 0]},
+        "driver": {"$arrayElemAt": ["$driver", 0]}
+    }},
+    {"$lookup": {"from": "users", "localField": "passenger.user_id", "foreignField": "_id", "as": "passenger_user"}},
+    {"$lookup": {"from": "users", "localField": "driver.user_id", "foreignField": "_id", "as": "driver_user"}},
+    # Nest each user under its profile, leaving a missing profile missing
+    {"$addFields": {
+        "passenger": {"$cond": [
+            {"$ifNull": ["$passenger", False]},
+            {"$mergeObjects": ["$passenger", {"user": {"$arrayElemAt": ["$passenger_user", 0]}}]},
+            "$$REMOVE"
+        ]},
+        "driver": {"$cond": [
+            {"$ifNull": ["$driver", False]},
+            {"$mergeObjects": ["$driver", {"user": {"$arrayElemAt": ["$driver_user", 0]}}]},
+            "$$REMOVE"
+        ]}
+    }}
+]
+
+# The joined rides trimmed to the RideDetailOut fields
+RIDE_DETAILS_PIPELINE = [
+    *RIDE_PEOPLE_STAGES,
+    # Only ship the fields the response uses (notably never password_hash)
+    {"$project": {
+        **{field: 1 for field in _RIDE_DETAIL_FIELDS},
+        **{f"passenger.{field}": 1 for field in ["_id", "user_id", "rating", "total_rides"]},
+        **{f"driver.{field}": 1 for field in ["_id", "user_id", "vehicle_make", "vehicle_model", "license_plate", "is_online"]},
+        **{f"passenger.user.{field}": 1 for field in ["_id", *_USER_DETAIL_FIELDS]},
+        **{f"driver.user.{field}": 1 for field in ["_id", *_USER_DETAIL_FIELDS]}
+    }}
+]
+
+# Validates and serializes a whole page of ride details in pydantic-core
+RIDE_DETAILS_ADAPTER = TypeAdapter(List[RideDetailOut])
 
 @app.get("/debug/rides-with-details")
-async def debug_get_rides_with_details():
-    """Get all rides with passenger and driver details for admin"""
-    try:
-        # Fetch all rides
-        rides = await Ride.find_all().to_list()
-        
-        # Collect all passenger and driver IDs
-        passenger_ids = [ride.passenger_id for ride in rides if ride.passenger_id]
-        driver_ids = [ride.driver_id for ride in rides if ride.driver_id]
-        
-        # Fetch passengers
-        passengers = {p.id: p async for p in Passenger.find({"_id": {"$in": passenger_ids}})}
-        
-        # Fetch drivers
-        drivers = {d.id: d async for d in Driver.find({"_id": {"$in": driver_ids}})}
-        
-        # Fetch all user IDs for passengers and drivers
-        passenger_user_ids = [p.user_id for p in passengers.values()]
-        driver_user_ids = [d.user_id for d in drivers.values()]
-        all_user_ids = list(set(passenger_user_ids + driver_user_ids))
-        
-        # Fetch all users
-        users = {str(u.id): u async for u in User.find({"_id": {"$in": all_user_ids}})}
-        
-        # Create response with full details
-        ride_responses = []
-        for ride in rides:
-            passenger = passengers.get(ride.passenger_id)
-            driver = drivers.get(ride.driver_id) if ride.driver_id else None
-            
-            passenger_user = None
-            driver_user = None
-            
-            if passenger:
-                passenger_user = users.get(str(passenger.user_id))
-            if driver:
-                driver_user = users.get(str(driver.user_id))
-            
-            # Create ride response with full details
-            ride_response = {
-                "id": str(ride.id),
-                "passenger_id": ride.passenger_id,
-                "driver_id": ride.driver_id,
-                "status": ride.status,
-                "pickup_latitude": ride.pickup_latitude,
-                "pickup_longitude": ride.pickup_longitude,
-                "pickup_address": ride.pickup_address,
-                "dropoff_latitude": ride.dropoff_latitude,
-                "dropoff_longitude": ride.dropoff_longitude,
-                "dropoff_address": ride.dropoff_address,
-                "requested_at": ride.requested_at.isoformat() if ride.requested_at else None,
-                "assigned_at": ride.assigned_at.isoformat() if ride.assigned_at else None,
-                "picked_up_at": ride.picked_up_at.isoformat() if ride.picked_up_at else None,
-                "completed_at": ride.completed_at.isoformat() if ride.completed_at else None,
-                "distance": ride.distance,
-                "start_km": ride.start_km,
-                "end_km": ride.end_km,
-                "passenger": {
-                    "id": str(passenger.id) if passenger else None,
-                    "user_id": passenger.user_id if passenger else None,
-                    "rating": passenger.rating if passenger else 0.0,
-                    "total_rides": passenger.total_rides if passenger else 0,
-                    "user": {
-                        "id": str(passenger_user.id) if passenger_user else None,
-                        "name": passenger_user.name if passenger_user else "Unknown",
-                        "email": passenger_user.email if passenger_user else "No email",
-                        "phone": passenger_user.phone if passenger_user else "No phone",
-                        "role": passenger_user.role if passenger_user else "passenger",
-                        "avatar": passenger_user.avatar if passenger_user else None,
-                        "created_at": passenger_user.created_at.isoformat() if passenger_user and passenger_user.created_at else None,
-                        "is_active": passenger_user.is_active if passenger_user else True
-                    } if passenger_user else None
-                } if passenger else None,
-                "driver": {
-                    "id": str(driver.id) if driver else None,
-                    "user_id": driver.user_id if driver else None,
-                    "vehicle_make": driver.vehicle_make if driver else None,
-                    "vehicle_model": driver.vehicle_model if driver else None,
-                    "license_plate": driver.license_plate if driver else None,
-                    "is_online": driver.is_online if driver else False,
-                    "user": {
-                        "id": str(driver_user.id) if driver_user else None,
-                        "name": driver_user.name if driver_user else "Unknown",
-                        "email": driver_user.email if driver_user else "No email",
-                        "phone": driver_user.phone if driver_user else "No phone",
-                        "role": driver_user.role if driver_user else "driver",
-                        "avatar": driver_user.avatar if driver_user else None,
-                        "created_at": driver_user.created_at.isoformat() if driver_user and driver_user.created_at else None,
-                        "is_active": driver_user.is_active if driver_user else True
-                    } if driver_user else None
-                } if driver else None
-            }
-            ride_responses.append(ride_response)
-        
-        return {
-            "status": "success",
-            "rides": ride_responses,
-            "total": len(ride_responses)
-        }
-        
-    except Exception as e:
-        print(f"Error in debug_get_rides_with_details: {e}")
-        return {
-            "status": "error",
-            "message": str(e),
-            "rides": []
-        }
+async def debug_get_rides_with_details(limit: Optional[int] = Query(None, ge=1), offset: int = Query(0, ge=0)):
+    """Get all rides with passenger and driver details for admin
+    
+    Pass limit/offset to page through large collections; the page is cut
+    before the joins so only the selected rides are looked up. "total" is
+    always the number of rides in the collection and "count" the number
+    returned in this response.
+    """
+    page = []
+    if offset > 0 or limit is not None:
+        # Stable order (on the _id index) so consecutive pages don't overlap
+        page.append({"$sort": {"_id": 1}})
+        if offset > 0:
+            page.append({"$skip": offset})
+        if limit is not None:
+            page.append({"$limit": limit})
+        rides, total = await asyncio.gather(
+            Ride.aggregate(page + RIDE_DETAILS_PIPELINE).to_list(),
+            Ride.find_all().count()
+        )
+    else:
+        rides = await Ride.aggregate(RIDE_DETAILS_PIPELINE).to_list()
+        total = len(rides)
+    
+    # Shape the joined documents with the response model and encode them
+    # straight to JSON bytes, then wrap them in the usual envelope
+    rides_json = RIDE_DETAILS_ADAPTER.dump_json(RIDE_DETAILS_ADAPTER.validate_python(rides))
+    return cached_json(
+        b'{"status":"success","rides":' + rides_json
+        + b',"total":' + str(total).encode()
+        + b',"count":' + str(len(rides)).encode() + b'}'
+    )
 
 # Authentication endpoints
 @app.post("/auth/login")
 async def login(user_credentials: dict):
-    print(f"🔐 Login attempt for email: {user_credentials.get('email')}")
+    logger.debug("🔐 Login attempt for email: %s", user_credentials.get('email'))
     
     user = await User.find_one({"email": user_credentials.get("email")})
     
     if not user:
-        print(f"❌ User not found for email: {user_credentials.get('email')}")
+        logger.warning("❌ User not found for email: %s", user_credentials.get('email'))
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
-    print(f"✅ User found: {user.name} (role: {user.role})")
+    logger.debug("✅ User found: %s (role: %s)", user.name, user.role)
     
-    if not verify_password(user_credentials.get("password"), user.password_hash):
-        print(f"❌ Password verification failed for user: {user.email}")
+    # bcrypt is CPU-bound; run it off the event loop so other requests keep flowing
+    password_ok = await run_in_threadpool(verify_password, user_credentials.get("password"), user.password_hash)
+    if not password_ok:
+        logger.warning("❌ Password verification failed for user: %s", user.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
-    print(f"✅ Password verified successfully for user: {user.email}")
+    logger.debug("✅ Password verified successfully for user: %s", user.email)
     
     access_token_expires = timedelta(minutes=30)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
     )
     
-    print(f"🎉 Login successful for user: {user.name}")
+    logger.debug("🎉 Login successful for user: %s", user.name)
     
     return {
         "access_token": access_token,
@@ -596,9 +734,10 @@ async def create_user(user_data: dict, current_user: User = Depends(get_current_
         email=user_data.get("email"),
         phone=user_data.get("phone"),
         role=user_data.get("role"),
-        password_hash=get_password_hash("password"),  # Default password
+        password_hash=DEFAULT_PASSWORD_HASH,  # Default password
     )
     await new_user.insert()
+    await invalidate_cache()
     
     return new_user
 
@@ -616,7 +755,7 @@ async def create_driver(driver_data: dict, current_user: User = Depends(get_curr
         email=driver_data.get("user", {}).get("email"),
         phone=driver_data.get("user", {}).get("phone"),
         role="driver",
-        password_hash=get_password_hash("password"),  # Default password
+        password_hash=DEFAULT_PASSWORD_HASH,  # Default password
     )
     await new_user.insert()
     
@@ -635,6 +774,7 @@ async def create_driver(driver_data: dict, current_user: User = Depends(get_curr
         total_rides=driver_data.get("total_rides", 0),
         current_km_reading=driver_data.get("current_km_reading", 0)
     )
+    await invalidate_cache()
     
     return driver_profile
 
@@ -652,7 +792,7 @@ async def create_passenger(passenger_data: dict, current_user: User = Depends(ge
         email=passenger_data.get("user", {}).get("email"),
         phone=passenger_data.get("user", {}).get("phone"),
         role="passenger",
-        password_hash=get_password_hash("password"),  # Default password
+        password_hash=DEFAULT_PASSWORD_HASH,  # Default password
     )
     await new_user.insert()
     
@@ -663,6 +803,7 @@ async def create_passenger(passenger_data: dict, current_user: User = Depends(ge
         total_rides=passenger_data.get("total_rides", 0)
     )
     await passenger_profile.insert()
+    await invalidate_cache()
     
     return passenger_profile
 
@@ -678,313 +819,192 @@ async def get_all_passengers(current_user: User = Depends(get_current_admin)):
     """Get all passengers (admin only)"""
     passengers = await Passenger.find_all().to_list()
     user_ids = [p.user_id for p in passengers]
-    users = {str(u.id): u async for u in User.find({"_id": {"$in": user_ids}})}
+    # The projection keeps password hashes out of the query and the response
+    users = {u.id: u for u in await User.find({"_id": {"$in": user_ids}}).project(UserSafeView).to_list()}
     response = []
     for p in passengers:
-        user = users.get(str(p.user_id))
+        user = users.get(p.user_id)
         passenger_dict = p.dict()
         passenger_dict["user"] = user.dict() if user else None
         response.append(passenger_dict)
-    return response
+    return ORJSONResp(response)
 
 @app.get("/passengers/me")
-async def get_current_passenger_profile(current_user: User = Depends(get_current_user)):
+async def get_current_passenger_profile(passenger: Passenger = Depends(get_current_passenger_record)):
     """Get current passenger's profile (for passengers to find their profile ID)"""
-    try:
-        print(f"🔍 Passenger /me endpoint called for user: {current_user.id}, role: {current_user.role}")
-        
-        if current_user.role != "passenger":
-            print(f"❌ User {current_user.id} is not a passenger (role: {current_user.role})")
-            raise HTTPException(status_code=403, detail="Only passengers can access this endpoint")
-        
-        print(f"🔍 Looking for passenger with user_id: {current_user.id}")
-        passenger = await Passenger.find_one({"user_id": current_user.id})
-        
-        if not passenger:
-            print(f"❌ No passenger profile found for user_id: {current_user.id}")
-            # Let's check if there are any passengers at all
-            all_passengers = await Passenger.find_all().to_list()
-            print(f"🔍 Total passengers in database: {len(all_passengers)}")
-            for p in all_passengers:
-                print(f"🔍 Passenger: {p.id}, user_id: {p.user_id}")
-            raise HTTPException(status_code=404, detail="Passenger profile not found")
-        
-        print(f"✅ Found passenger profile: {passenger.id}")
-        print(f"🔍 Passenger object structure: {passenger}")
-        return {"status": "success", "passenger": passenger}
-    except Exception as e:
-        print(f"❌ Error in /passengers/me: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to get passenger profile: {str(e)}")
+    logger.debug("✅ Found passenger profile: %s", passenger.id)
+    logger.debug("🔍 Passenger object structure: %s", passenger)
+    return {"status": "success", "passenger": passenger}
 
 @app.put("/drivers/me/status")
 async def update_driver_status(
     request: Request,
-    current_user: User = Depends(get_current_driver)
+    current_user: User = Depends(get_current_driver),
+    driver: Driver = Depends(get_current_driver_record)
 ):
     """Update driver online/offline status"""
+    logger.debug("🔍 Driver status update requested for user: %s", current_user.id)
+    
+    # Try to get data from JSON body first
     try:
-        print(f"🔍 Driver status update requested for user: {current_user.id}")
-        
-        driver = await Driver.find_one({"user_id": current_user.id})
-        if not driver:
-            print(f"❌ Driver profile not found for user: {current_user.id}")
-            raise HTTPException(status_code=404, detail="Driver profile not found")
-        
-        # Try to get data from JSON body first
-        try:
-            body_data = await request.json()
-            is_online = body_data.get("is_online", False)
-            print(f"🔍 Status from JSON body: {is_online}")
-        except:
-            # If JSON parsing fails, try query parameters
-            is_online = request.query_params.get("is_online", "false").lower() == "true"
-            print(f"🔍 Status from query params: {is_online}")
-        
-        print(f"🔍 Updating driver {driver.id} status from {driver.is_online} to {is_online}")
-        driver.is_online = is_online
-        await driver.save()
-        
-        print(f"✅ Driver status updated successfully: {driver.is_online}")
-        return {"status": "success", "message": "Driver status updated", "driver": driver}
-    except Exception as e:
-        print(f"❌ Error updating driver status: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to update driver status: {str(e)}")
+        body_data = await request.json()
+        is_online = body_data.get("is_online", False)
+        logger.debug("🔍 Status from JSON body: %s", is_online)
+    except:
+        # If JSON parsing fails, try query parameters
+        is_online = request.query_params.get("is_online", "false").lower() == "true"
+        logger.debug("🔍 Status from query params: %s", is_online)
+    
+    logger.debug("🔍 Updating driver %s status from %s to %s", driver.id, driver.is_online, is_online)
+    await Driver.get_motor_collection().update_one({"_id": driver.id}, {"$set": {"is_online": is_online}})
+    driver.is_online = is_online
+    await invalidate_cache()
+    
+    logger.debug("✅ Driver status updated successfully: %s", driver.is_online)
+    return {"status": "success", "message": "Driver status updated", "driver": driver}
 
 @app.get("/drivers/me")
-async def get_current_driver_profile(current_user: User = Depends(get_current_driver)):
+async def get_current_driver_profile(driver: Driver = Depends(get_current_driver_record)):
     """Get current driver's profile"""
-    try:
-        driver = await Driver.find_one({"user_id": current_user.id})
-        if not driver:
-            raise HTTPException(status_code=404, detail="Driver profile not found")
-        
-        return {"status": "success", "driver": driver}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get driver profile: {str(e)}")
+    return {"status": "success", "driver": driver}
 
 @app.post("/vehicles")
-async def create_vehicle(vehicle_data: dict, current_user: User = Depends(get_current_admin)):
+async def create_vehicle(vehicle_data: VehicleCreate, current_user: User = Depends(get_current_admin)):
     """Create a new vehicle (admin only, not attached to a driver)"""
-    print(f"🚗 Creating vehicle with data: {vehicle_data}")
+    logger.debug("🚗 Creating vehicle with data: %s", vehicle_data)
     
-    # Validate required fields
-    required_fields = [
+    vehicle = Vehicle(**vehicle_data.model_dump())
+    await vehicle.insert()
+    await invalidate_cache()
+    logger.debug("✅ Vehicle created successfully with ID: %s", vehicle.id)
+    return vehicle
+
+# Shape shared by directly created vehicles and vehicles attached to drivers
+_VEHICLE_PROJECTION = {
+    "_id": 0,
+    "id": "$_id",
+    **{field: 1 for field in [
         "vehicle_make", "vehicle_model", "vehicle_year", "license_plate",
         "vehicle_color", "license_number", "license_expiry"
-    ]
-    for field in required_fields:
-        if not vehicle_data.get(field):
-            print(f"❌ Missing required field: {field}")
-            raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
-    
-    # Parse license_expiry to datetime
-    license_expiry = vehicle_data["license_expiry"]
-    if isinstance(license_expiry, str):
-        try:
-            license_expiry = datetime.strptime(license_expiry, "%d-%m-%Y")
-            print(f"✅ Parsed license_expiry: {license_expiry}")
-        except Exception as e:
-            print(f"❌ Error parsing license_expiry: {e}")
-            raise HTTPException(status_code=400, detail="license_expiry must be in DD-MM-YYYY format")
-    
-    try:
-        vehicle = Vehicle(
-            vehicle_make=vehicle_data["vehicle_make"],
-            vehicle_model=vehicle_data["vehicle_model"],
-            vehicle_year=int(vehicle_data["vehicle_year"]),
-            license_plate=vehicle_data["license_plate"],
-            vehicle_color=vehicle_data["vehicle_color"],
-            license_number=vehicle_data["license_number"],
-            license_expiry=license_expiry
-        )
-        await vehicle.insert()
-        print(f"✅ Vehicle created successfully with ID: {vehicle.id}")
-        return vehicle
-    except Exception as e:
-        print(f"❌ Error creating vehicle: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to create vehicle: {str(e)}")
+    ]},
+    "created_at": {"$ifNull": ["$created_at", None]},
+    "updated_at": {"$ifNull": ["$updated_at", None]}
+}
+
+# Vehicles followed by every driver with complete vehicle details, in one query
+ALL_VEHICLES_PIPELINE = [
+    {"$project": _VEHICLE_PROJECTION},
+    {"$unionWith": {"coll": "drivers", "pipeline": [
+        {"$match": {
+            field: {"$nin": [None, ""]}
+            for field in ["vehicle_make", "vehicle_model", "license_plate", "vehicle_color"]
+        }},
+        {"$project": _VEHICLE_PROJECTION}
+    ]}}
+]
 
 @app.get("/vehicles")
 async def get_all_vehicles(current_user: User = Depends(get_current_admin)):
     """Get all vehicles (admin only) - includes both direct vehicles and driver vehicles"""
-    # Vehicles created directly
-    vehicles = await Vehicle.find_all().to_list()
-    vehicle_list = [
-        {
-            "id": v.id,
-            "vehicle_make": v.vehicle_make,
-            "vehicle_model": v.vehicle_model,
-            "vehicle_year": v.vehicle_year,
-            "license_plate": v.license_plate,
-            "vehicle_color": v.vehicle_color,
-            "license_number": v.license_number,
-            "license_expiry": v.license_expiry.isoformat() if v.license_expiry else None,
-            "created_at": v.created_at.isoformat() if v.created_at else None,
-            "updated_at": v.updated_at.isoformat() if v.updated_at else None
-        }
-        for v in vehicles
-    ]
-    # Vehicles attached to drivers
-    drivers = await Driver.find_all().to_list()
-    for driver in drivers:
-        if (driver.vehicle_make and driver.vehicle_model and 
-            driver.license_plate and driver.vehicle_color):
-            vehicle_list.append({
-                "id": str(driver.id),
-                "vehicle_make": driver.vehicle_make,
-                "vehicle_model": driver.vehicle_model,
-                "vehicle_year": driver.vehicle_year,
-                "license_plate": driver.license_plate,
-                "vehicle_color": driver.vehicle_color,
-                "license_number": driver.license_number,
-                "license_expiry": driver.license_expiry.isoformat() if driver.license_expiry else None,
-                "created_at": driver.created_at.isoformat() if hasattr(driver, 'created_at') and driver.created_at else None,
-                "updated_at": driver.updated_at.isoformat() if hasattr(driver, 'updated_at') and driver.updated_at else None
-            })
-    return vehicle_list
+    return await stream_json_list(Vehicle.aggregate(ALL_VEHICLES_PIPELINE))
+
+async def driver_name_lookup(query: dict) -> tuple:
+    """Fetch the drivers matching query and their users, keyed by id.
+
+    There are far fewer drivers than fuel entries or attendance records, so
+    loading them up front lets those listings stream straight off the cursor"""
+    drivers = {d.id: d for d in await Driver.find(query).project(DriverSummaryView).to_list()}
+    user_ids = [d.user_id for d in drivers.values()]
+    users = {u.id: u for u in await User.find({"_id": {"$in": user_ids}}).project(UserNameView).to_list()}
+    return drivers, users
 
 # Fuel entries management
 @app.get("/fuel-entries")
 async def get_fuel_entries(current_user: User = Depends(get_current_admin)):
     """Get all fuel entries (admin only)"""
-    try:
-        fuel_entries = await FuelEntry.find_all().to_list()
-        
-        # Get driver info for each fuel entry
-        fuel_list = []
-        
-        # First, get all available drivers to use as fallback
-        all_drivers = await Driver.find_all().to_list()
-        default_driver = all_drivers[0] if all_drivers else None
-        default_user = None
-        if default_driver:
-            default_user = await User.find_one({"_id": default_driver.user_id})
-        
-        print(f"🔍 Found {len(all_drivers)} drivers, using default: {default_driver.id if default_driver else 'None'}")
-        
-        for entry in fuel_entries:
-            try:
-                print(f"🔍 Processing fuel entry {entry.id} with driver_id: {entry.driver_id}")
-                
-                # Use find_one instead of get for better MongoDB compatibility
-                driver = await Driver.find_one({"_id": entry.driver_id})
-                print(f"🔍 Found driver: {driver.id if driver else 'None'}")
-                
-                user = None
-                if driver:
-                    user = await User.find_one({"_id": driver.user_id})
-                    print(f"🔍 Found user: {user.name if user else 'None'}")
-                else:
-                    # If driver not found, use default driver
-                    driver = default_driver
-                    user = default_user
-                    print(f"🔍 Using default driver: {driver.id if driver else 'None'}")
-                
-                fuel_data = {
-                    "id": str(entry.id),
-                    "driver_id": str(entry.driver_id),
-                    "driver_name": user.name if user else "Unknown",
-                    "vehicle_make": driver.vehicle_make if driver else "Unknown",
-                    "license_plate": driver.license_plate if driver else "Unknown",
-                    "fuel_amount": entry.amount,
-                    "fuel_cost": entry.cost,
-                    "fuel_station": entry.location,
-                    "date": entry.date.isoformat() if entry.date else None
-                }
-                fuel_list.append(fuel_data)
-            except Exception as e:
-                print(f"❌ Error processing fuel entry {entry.id}: {e}")
-                continue
-        
-        return {"status": "success", "fuel_entries": fuel_list}
-    except Exception as e:
-        print(f"❌ Error fetching fuel entries: {e}")
-        return {"status": "error", "message": str(e)}
+    drivers, users = await driver_name_lookup({})
+    
+    async def fuel_list():
+        async for entry in FuelEntry.find_all().project(FuelEntryView):
+            driver = drivers.get(entry.driver_id)
+            user = users.get(driver.user_id) if driver else None
+            yield {
+                "id": entry.id,
+                "driver_id": entry.driver_id,
+                "driver_name": user.name if user else "Unknown",
+                "vehicle_make": driver.vehicle_make if driver else "Unknown",
+                "license_plate": driver.license_plate if driver else "Unknown",
+                "fuel_amount": entry.amount,
+                "fuel_cost": entry.cost,
+                "fuel_station": entry.location,
+                "date": entry.date
+            }
+    
+    return await stream_json("fuel_entries", fuel_list())
+
+def fuel_entry_date(value: Optional[str]) -> datetime:
+    """Parse a fuel entry date, falling back to now when missing or unparseable"""
+    if value:
+        try:
+            return parse_date(value)
+        except ValueError:
+            pass
+    return datetime.utcnow()
+
+def build_admin_fuel_entry(fuel_data: AdminFuelEntryCreate, admin_id: str) -> FuelEntry:
+    """Build the (unsaved) document for a validated admin fuel entry"""
+    return FuelEntry(
+        driver_id=fuel_data.driver_id,
+        amount=fuel_data.fuel_amount,
+        cost=fuel_data.fuel_cost,
+        location=fuel_data.fuel_station,
+        date=fuel_entry_date(fuel_data.date),
+        added_by="admin",
+        admin_id=admin_id
+    )
 
 @app.post("/fuel-entries")
-async def create_fuel_entry(fuel_data: dict, current_user: User = Depends(get_current_admin)):
+async def create_fuel_entry(fuel_data: AdminFuelEntryCreate, current_user: User = Depends(get_current_admin)):
     """Create a new fuel entry (admin only)"""
-    try:
-        # Validate required fields
-        required_fields = ["driver_id", "fuel_amount", "fuel_cost"]
-        for field in required_fields:
-            if not fuel_data.get(field):
-                raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
-        
-        # Parse date if provided
-        fuel_date = fuel_data.get("date")
-        if fuel_date and isinstance(fuel_date, str):
-            try:
-                fuel_date = datetime.strptime(fuel_date, "%Y-%m-%d")
-            except:
-                fuel_date = datetime.utcnow()
-        else:
-            fuel_date = datetime.utcnow()
-        
-        fuel_entry = FuelEntry(
-            driver_id=fuel_data["driver_id"],
-            amount=float(fuel_data["fuel_amount"]),
-            cost=float(fuel_data["fuel_cost"]),
-            location=fuel_data.get("fuel_station", "Unknown"),
-            date=fuel_date,
-            added_by="admin",
-            admin_id=current_user.id
-        )
-        await fuel_entry.insert()
-        
-        return {"status": "success", "fuel_entry": fuel_entry}
-    except Exception as e:
-        print(f"❌ Error creating fuel entry: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to create fuel entry: {str(e)}")
+    fuel_entry = build_admin_fuel_entry(fuel_data, current_user.id)
+    await fuel_entry.insert()
+    
+    return {"status": "success", "fuel_entry": fuel_entry}
+
+@app.post("/fuel-entries/bulk")
+async def create_fuel_entries_bulk(fuel_data_list: List[AdminFuelEntryCreate], current_user: User = Depends(get_current_admin)):
+    """Create many fuel entries in one insert (admin only)"""
+    # FastAPI has already validated every entry, so nothing is written on bad input
+    fuel_entries = [build_admin_fuel_entry(fuel_data, current_user.id) for fuel_data in fuel_data_list]
+    if fuel_entries:
+        await FuelEntry.insert_many(fuel_entries)
+    
+    return {"status": "success", "fuel_entries": fuel_entries, "total": len(fuel_entries)}
 
 @app.post("/fuel-entries/me")
-async def create_my_fuel_entry(fuel_data: dict, current_user: User = Depends(get_current_driver)):
+async def create_my_fuel_entry(
+    fuel_data: DriverFuelEntryCreate,
+    current_user: User = Depends(get_current_driver),
+    driver: Driver = Depends(get_current_driver_record)
+):
     """Create a new fuel entry for the current driver"""
-    try:
-        print(f"🔧 Creating fuel entry for driver: {current_user.id}")
-        print(f"🔧 Fuel data received: {fuel_data}")
-        
-        # Validate required fields
-        required_fields = ["amount", "cost", "location"]
-        for field in required_fields:
-            if not fuel_data.get(field):
-                print(f"❌ Missing required field: {field}")
-                raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
-        
-        # Get the driver record for this user
-        driver = await Driver.find_one({"user_id": current_user.id})
-        if not driver:
-            print(f"❌ Driver profile not found for user: {current_user.id}")
-            raise HTTPException(status_code=404, detail="Driver profile not found")
-        
-        print(f"🔧 Found driver: {driver.id}")
-        
-        # Parse date if provided
-        fuel_date = fuel_data.get("date")
-        if fuel_date and isinstance(fuel_date, str):
-            try:
-                fuel_date = datetime.strptime(fuel_date, "%Y-%m-%d")
-            except:
-                fuel_date = datetime.utcnow()
-        else:
-            fuel_date = datetime.utcnow()
-        
-        fuel_entry = FuelEntry(
-            driver_id=str(driver.id),
-            amount=float(fuel_data["amount"]),
-            cost=float(fuel_data["cost"]),
-            location=fuel_data["location"],
-            date=fuel_date,
-            added_by="driver",
-            admin_id=current_user.id
-        )
-        await fuel_entry.insert()
-        
-        print(f"✅ Fuel entry created successfully: {fuel_entry.id}")
-        return {"status": "success", "fuel_entry": fuel_entry}
-    except Exception as e:
-        print(f"❌ Error creating fuel entry: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to create fuel entry: {str(e)}")
+    logger.debug("🔧 Creating fuel entry for driver: %s", current_user.id)
+    logger.debug("🔧 Fuel data received: %s", fuel_data)
+    logger.debug("🔧 Found driver: %s", driver.id)
+    
+    fuel_entry = FuelEntry(
+        driver_id=str(driver.id),
+        amount=fuel_data.amount,
+        cost=fuel_data.cost,
+        location=fuel_data.location,
+        date=fuel_entry_date(fuel_data.date),
+        added_by="driver",
+        admin_id=current_user.id
+    )
+    await fuel_entry.insert()
+    
+    logger.debug("✅ Fuel entry created successfully: %s", fuel_entry.id)
+    return {"status": "success", "fuel_entry": fuel_entry}
 
 # Ride management
 @app.post("/rides")
@@ -1001,6 +1021,7 @@ async def create_ride(ride_data: dict):
         status=RideStatus.REQUESTED
     )
     await new_ride.insert()
+    await invalidate_cache()
     return new_ride
 
 @app.get("/rides")
@@ -1012,32 +1033,16 @@ async def get_rides(passenger_id: Optional[str] = None, driver_id: Optional[str]
     if driver_id:
         query["driver_id"] = driver_id
 
-    rides = await Ride.find(query).to_list()
-
-    # Collect all driver and passenger IDs
-    driver_ids = [ride.driver_id for ride in rides if ride.driver_id]
-    passenger_ids = [ride.passenger_id for ride in rides if ride.passenger_id]
-
-    # Fetch drivers and passengers
-    drivers = {d.id: d async for d in Driver.find({"_id": {"$in": driver_ids}})}
-    passengers = {p.id: p async for p in Passenger.find({"_id": {"$in": passenger_ids}})}
-
-    # Fetch all user IDs
-    user_ids = [d.user_id for d in drivers.values()] + [p.user_id for p in passengers.values()]
-    users = {str(u.id): u async for u in User.find({"_id": {"$in": user_ids}})}
-
-    # Attach driver and passenger user info to each ride
-    for ride in rides:
-        driver = drivers.get(ride.driver_id)
-        if driver:
-            driver.user = users.get(str(driver.user_id))
-            ride.driver = driver
-        passenger = passengers.get(ride.passenger_id)
-        if passenger:
-            passenger.user = users.get(str(passenger.user_id))
-            ride.passenger = passenger
-
-    return rides
+    return await stream_json_list(Ride.aggregate([
+        {"$match": query},
+        *RIDE_PEOPLE_STAGES,
+        {"$project": {
+            "passenger_user": 0,
+            "driver_user": 0,
+            "passenger.user.password_hash": 0,
+            "driver.user.password_hash": 0
+        }}
+    ]))
 
 @app.get("/rides/pending")
 async def get_pending_rides(current_user: User = Depends(get_current_admin)):
@@ -1046,25 +1051,20 @@ async def get_pending_rides(current_user: User = Depends(get_current_admin)):
     return rides
 
 @app.get("/rides/assigned")
-async def get_assigned_rides(current_user: User = Depends(get_current_driver)):
+async def get_assigned_rides(driver: Driver = Depends(get_current_driver_record)):
     """Get rides assigned to current driver"""
-    # First, find the driver record for this user
-    driver = await Driver.find_one({"user_id": current_user.id})
-    if not driver:
-        raise HTTPException(status_code=404, detail="Driver profile not found")
-    
-    # Now use the driver.id to find rides
+    # Use the driver.id to find rides
     rides = await Ride.find({"driver_id": driver.id, "status": {"$in": [RideStatus.ASSIGNED, RideStatus.IN_PROGRESS]}}).to_list()
     
     # Collect all passenger IDs
     passenger_ids = [ride.passenger_id for ride in rides if ride.passenger_id]
     
     # Fetch passengers using _id field
-    passengers = {p.id: p async for p in Passenger.find({"_id": {"$in": passenger_ids}})}
+    passengers = {p.id: p for p in await Passenger.find({"_id": {"$in": passenger_ids}}).to_list()}
     
     # Fetch all user IDs for passengers
     user_ids = [p.user_id for p in passengers.values()]
-    users = {str(u.id): u async for u in User.find({"_id": {"$in": user_ids}})}
+    users = {u.id: u for u in await User.find({"_id": {"$in": user_ids}}).to_list()}
     
     # Create response with proper passenger structure
     ride_responses = []
@@ -1072,11 +1072,11 @@ async def get_assigned_rides(current_user: User = Depends(get_current_driver)):
         passenger = passengers.get(ride.passenger_id)
         passenger_user = None
         if passenger:
-            passenger_user = users.get(str(passenger.user_id))
+            passenger_user = users.get(passenger.user_id)
         
         # Create ride response with passenger details
         ride_response = {
-            "id": str(ride.id),
+            "id": ride.id,
             "passenger_id": ride.passenger_id,
             "driver_id": ride.driver_id,
             "status": ride.status,
@@ -1086,26 +1086,26 @@ async def get_assigned_rides(current_user: User = Depends(get_current_driver)):
             "dropoff_latitude": ride.dropoff_latitude,
             "dropoff_longitude": ride.dropoff_longitude,
             "dropoff_address": ride.dropoff_address,
-            "requested_at": ride.requested_at.isoformat() if ride.requested_at else None,
-            "assigned_at": ride.assigned_at.isoformat() if ride.assigned_at else None,
-            "picked_up_at": ride.picked_up_at.isoformat() if ride.picked_up_at else None,
-            "completed_at": ride.completed_at.isoformat() if ride.completed_at else None,
+            "requested_at": ride.requested_at,
+            "assigned_at": ride.assigned_at,
+            "picked_up_at": ride.picked_up_at,
+            "completed_at": ride.completed_at,
             "distance": ride.distance,
             "start_km": ride.start_km,
             "end_km": ride.end_km,
             "passenger": {
-                "id": str(passenger.id) if passenger else None,
+                "id": passenger.id if passenger else None,
                 "user_id": passenger.user_id if passenger else None,
                 "rating": passenger.rating if passenger else 0.0,
                 "total_rides": passenger.total_rides if passenger else 0,
                 "user": {
-                    "id": str(passenger_user.id) if passenger_user else None,
+                    "id": passenger_user.id if passenger_user else None,
                     "name": passenger_user.name if passenger_user else "Unknown",
                     "email": passenger_user.email if passenger_user else "No email",
                     "phone": passenger_user.phone if passenger_user else "No phone",
                     "role": passenger_user.role if passenger_user else "passenger",
                     "avatar": passenger_user.avatar if passenger_user else None,
-                    "created_at": passenger_user.created_at.isoformat() if passenger_user and passenger_user.created_at else None,
+                    "created_at": passenger_user.created_at if passenger_user else None,
                     "is_active": passenger_user.is_active if passenger_user else True
                 } if passenger_user else None
             } if passenger else None
@@ -1117,103 +1117,96 @@ async def get_assigned_rides(current_user: User = Depends(get_current_driver)):
 @app.post("/rides/{ride_id}/assign")
 async def assign_ride_to_driver(ride_id: str, driver_id: str, current_user: User = Depends(get_current_admin)):
     """Assign a ride to a driver (admin only)"""
-    try:
-        ride = await Ride.get(ride_id)
-        if not ride:
-            raise HTTPException(status_code=404, detail="Ride not found")
-        
-        driver = await Driver.get(driver_id)
-        if not driver:
-            raise HTTPException(status_code=404, detail="Driver not found")
-        
-        ride.driver_id = driver_id
-        ride.status = RideStatus.ASSIGNED
-        ride.assigned_at = datetime.utcnow()
-        await ride.save()
-        
-        return {"status": "success", "message": "Ride assigned successfully", "ride": ride}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to assign ride: {str(e)}")
+    ride = await Ride.get(ride_id)
+    if not ride:
+        raise HTTPException(status_code=404, detail="Ride not found")
+    
+    driver = await Driver.get(driver_id)
+    if not driver:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    
+    ride.driver_id = driver_id
+    ride.status = RideStatus.ASSIGNED
+    ride.assigned_at = datetime.utcnow()
+    await ride.save()
+    await invalidate_cache()
+    
+    return {"status": "success", "message": "Ride assigned successfully", "ride": ride}
 
 @app.post("/rides/manual")
 async def create_ride_manual(ride_data: dict, current_user: User = Depends(get_current_admin)):
     """Create a ride manually with driver assignment (admin only)"""
-    try:
-        # Create the ride
-        new_ride = Ride(
-            passenger_id=ride_data.get("passenger_id"),
-            driver_id=ride_data.get("driver_id"),
-            pickup_latitude=ride_data.get("pickup_latitude"),
-            pickup_longitude=ride_data.get("pickup_longitude"),
-            pickup_address=ride_data.get("pickup_address"),
-            dropoff_latitude=ride_data.get("dropoff_latitude"),
-            dropoff_longitude=ride_data.get("dropoff_longitude"),
-            dropoff_address=ride_data.get("dropoff_address"),
-            status=RideStatus.ASSIGNED if ride_data.get("driver_id") else RideStatus.REQUESTED,
-            assigned_at=datetime.utcnow() if ride_data.get("driver_id") else None
-        )
-        await new_ride.insert()
-        
-        return {"status": "success", "ride": new_ride}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create ride: {str(e)}")
+    # Create the ride
+    new_ride = Ride(
+        passenger_id=ride_data.get("passenger_id"),
+        driver_id=ride_data.get("driver_id"),
+        pickup_latitude=ride_data.get("pickup_latitude"),
+        pickup_longitude=ride_data.get("pickup_longitude"),
+        pickup_address=ride_data.get("pickup_address"),
+        dropoff_latitude=ride_data.get("dropoff_latitude"),
+        dropoff_longitude=ride_data.get("dropoff_longitude"),
+        dropoff_address=ride_data.get("dropoff_address"),
+        status=RideStatus.ASSIGNED if ride_data.get("driver_id") else RideStatus.REQUESTED,
+        assigned_at=datetime.utcnow() if ride_data.get("driver_id") else None
+    )
+    await new_ride.insert()
+    await invalidate_cache()
+    
+    return {"status": "success", "ride": new_ride}
+
+async def update_own_ride(ride_id: str, driver: Driver, update, action: str) -> dict:
+    """Apply update to a ride assigned to driver in one atomic round trip and
+    return the updated document; 404/403 when the ride is missing or not theirs"""
+    ride = await Ride.get_motor_collection().find_one_and_update(
+        {"_id": ride_id, "driver_id": driver.id},
+        update,
+        return_document=ReturnDocument.AFTER
+    )
+    if ride is None:
+        if await Ride.find({"_id": ride_id}).count() == 0:
+            raise HTTPException(status_code=404, detail="Ride not found")
+        raise HTTPException(status_code=403, detail=f"Not authorized to {action} this ride")
+    return ride
 
 @app.post("/rides/{ride_id}/start")
-async def start_ride(ride_id: str, start_data: dict, current_user: User = Depends(get_current_driver)):
+async def start_ride(ride_id: str, start_data: dict, driver: Driver = Depends(get_current_driver_record)):
     """Start a ride (driver only)"""
-    try:
-        # Find the driver record for this user
-        driver = await Driver.find_one({"user_id": current_user.id})
-        if not driver:
-            raise HTTPException(status_code=404, detail="Driver profile not found")
-        
-        ride = await Ride.get(ride_id)
-        if not ride:
-            raise HTTPException(status_code=404, detail="Ride not found")
-        
-        if ride.driver_id != str(driver.id):
-            raise HTTPException(status_code=403, detail="Not authorized to start this ride")
-        
-        ride.status = RideStatus.IN_PROGRESS
-        ride.picked_up_at = datetime.utcnow()
-        ride.start_km = start_data.get("start_km", 0)
-        await ride.save()
-        
-        return {"status": "success", "message": "Ride started successfully", "ride": ride}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to start ride: {str(e)}")
+    ride = await update_own_ride(ride_id, driver, {"$set": {
+        "status": RideStatus.IN_PROGRESS.value,
+        "picked_up_at": datetime.utcnow(),
+        "start_km": start_data.get("start_km", 0)
+    }}, action="start")
+    await invalidate_cache()
+    
+    return {"status": "success", "message": "Ride started successfully", "ride": ride}
 
 @app.post("/rides/{ride_id}/complete")
-async def complete_ride(ride_id: str, complete_data: dict, current_user: User = Depends(get_current_driver)):
+async def complete_ride(ride_id: str, complete_data: dict, driver: Driver = Depends(get_current_driver_record)):
     """Complete a ride (driver only)"""
-    try:
-        # Find the driver record for this user
-        driver = await Driver.find_one({"user_id": current_user.id})
-        if not driver:
-            raise HTTPException(status_code=404, detail="Driver profile not found")
-        
-        ride = await Ride.get(ride_id)
-        if not ride:
-            raise HTTPException(status_code=404, detail="Ride not found")
-        
-        if ride.driver_id != str(driver.id):
-            raise HTTPException(status_code=403, detail="Not authorized to complete this ride")
-        
-        ride.status = RideStatus.COMPLETED
-        ride.completed_at = datetime.utcnow()
-        ride.end_km = complete_data.get("end_km", 0)
-        ride.distance = ride.end_km - ride.start_km if ride.start_km and ride.end_km else 0
-        
-        # Update driver's current km reading
-        driver.current_km_reading = ride.end_km
-        driver.total_rides += 1
-        await driver.save()
-        
-        await ride.save()
-        
-        return {"status": "success", "message": "Ride completed successfully", "ride": ride}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to complete ride: {str(e)}")
+    end_km = complete_data.get("end_km", 0)
+    # distance = end_km - start_km when both are set (non-zero), computed in
+    # the update against the stored start_km. Both sides are coerced to
+    # numbers, so a missing, null or legacy string reading counts as 0
+    # instead of making $subtract fail (client values go through $literal
+    # so they're never field paths)
+    start = {"$convert": {"input": "$start_km", "to": "double", "onError": 0, "onNull": 0}}
+    end = {"$convert": {"input": {"$literal": end_km}, "to": "double", "onError": 0, "onNull": 0}}
+    distance = {"$cond": [{"$and": [{"$ne": [start, 0]}, {"$ne": [end, 0]}]}, {"$subtract": [end, start]}, 0]}
+    ride = await update_own_ride(ride_id, driver, [{"$set": {
+        "status": RideStatus.COMPLETED.value,
+        "completed_at": datetime.utcnow(),
+        "end_km": {"$literal": end_km},
+        "distance": distance
+    }}], action="complete")
+    
+    # Update driver's current km reading
+    await Driver.get_motor_collection().update_one(
+        {"_id": driver.id},
+        {"$inc": {"total_rides": 1}, "$set": {"current_km_reading": end_km}}
+    )
+    await invalidate_cache()
+    
+    return {"status": "success", "message": "Ride completed successfully", "ride": ride}
 
 # Attendance endpoints
 @app.get("/attendance")
@@ -1224,397 +1217,355 @@ async def get_attendance(
     current_user: User = Depends(get_current_admin)
 ):
     """Get attendance records (admin only)"""
-    try:
-        # Build query
-        query = {}
-        
-        if driver_id:
-            query["driver_id"] = driver_id
-        
-        if start_date:
-            try:
-                # Try to parse as ISO date
-                start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-                query["date"] = {"$gte": start_dt}
-            except:
-                # Try to parse as DD-MM-YYYY
-                try:
-                    start_dt = datetime.strptime(start_date, "%d-%m-%Y")
-                    query["date"] = {"$gte": start_dt}
-                except:
-                    pass
-        
-        if end_date:
-            try:
-                # Try to parse as ISO date
-                end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-                if "date" in query:
-                    query["date"]["$lte"] = end_dt
-                else:
-                    query["date"] = {"$lte": end_dt}
-            except:
-                # Try to parse as DD-MM-YYYY
-                try:
-                    end_dt = datetime.strptime(end_date, "%d-%m-%Y")
-                    if "date" in query:
-                        query["date"]["$lte"] = end_dt
-                    else:
-                        query["date"] = {"$lte": end_dt}
-                except:
-                    pass
-        
-        print(f"🔍 Attendance query: {query}")
-        
-        # Get attendance records
-        attendance_records = await DriverAttendance.find(query).to_list()
-        
-        # Get driver info for each record
-        attendance_list = []
-        for record in attendance_records:
-            try:
-                driver = await Driver.find_one({"_id": record.driver_id})
-                user = None
-                if driver:
-                    user = await User.find_one({"_id": driver.user_id})
-                
-                attendance_data = {
-                    "id": str(record.id),
-                    "driver_id": str(record.driver_id),
-                    "driver_name": user.name if user else "Unknown",
-                    "date": record.date.isoformat() if record.date else None,
-                    "check_in_time": record.check_in.isoformat() if record.check_in else None,
-                    "check_out_time": record.check_out.isoformat() if record.check_out else None,
-                    "status": record.status,
-                    "notes": record.notes if hasattr(record, 'notes') else None
-                }
-                attendance_list.append(attendance_data)
-            except Exception as e:
-                print(f"❌ Error processing attendance record {record.id}: {e}")
-                continue
-        
-        return {
-            "status": "success",
-            "attendance": attendance_list,
-            "total": len(attendance_list)
-        }
-    except Exception as e:
-        print(f"❌ Error fetching attendance: {e}")
-        return {"status": "error", "message": str(e)}
+    # Build query
+    query = {}
+    
+    if driver_id:
+        query["driver_id"] = driver_id
+    
+    # Unparseable bounds are ignored
+    date_range = {}
+    if start_date:
+        try:
+            date_range["$gte"] = parse_date(start_date)
+        except ValueError:
+            pass
+    if end_date:
+        try:
+            date_range["$lte"] = parse_date(end_date)
+        except ValueError:
+            pass
+    if date_range:
+        query["date"] = date_range
+    
+    logger.debug("🔍 Attendance query: %s", query)
+    
+    drivers, users = await driver_name_lookup({"_id": driver_id} if driver_id else {})
+    
+    async def attendance_list():
+        async for record in DriverAttendance.find(query).project(AttendanceView):
+            driver = drivers.get(record.driver_id)
+            user = users.get(driver.user_id) if driver else None
+            yield {
+                "id": record.id,
+                "driver_id": record.driver_id,
+                "driver_name": user.name if user else "Unknown",
+                "date": record.date,
+                "check_in_time": record.check_in,
+                "check_out_time": record.check_out,
+                "status": record.status,
+                "notes": record.notes
+            }
+    
+    return await stream_json("attendance", attendance_list(), with_total=True)
+
+def build_attendance_record(attendance_data: AttendanceCreate) -> DriverAttendance:
+    """Build the (unsaved) document for a validated attendance payload"""
+    return DriverAttendance(
+        driver_id=attendance_data.driver_id,
+        date=attendance_data.date,
+        check_in=attendance_data.check_in_time,
+        check_out=attendance_data.check_out_time,
+        status=attendance_data.status
+    )
+
+def attendance_summary(attendance: DriverAttendance) -> dict:
+    return {
+        "id": attendance.id,
+        "driver_id": attendance.driver_id,
+        "date": attendance.date,
+        "status": attendance.status
+    }
 
 @app.post("/attendance")
-async def create_attendance(attendance_data: dict, current_user: User = Depends(get_current_admin)):
+async def create_attendance(attendance_data: AttendanceCreate, current_user: User = Depends(get_current_admin)):
     """Create attendance record (admin only)"""
-    try:
-        # Validate required fields
-        required_fields = ["driver_id", "date"]
-        for field in required_fields:
-            if field not in attendance_data:
-                raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
-        
-        # Parse date
-        try:
-            if isinstance(attendance_data["date"], str):
-                # Try to parse as ISO date
-                try:
-                    date_obj = datetime.fromisoformat(attendance_data["date"].replace('Z', '+00:00'))
-                except:
-                    # Try to parse as DD-MM-YYYY
-                    date_obj = datetime.strptime(attendance_data["date"], "%d-%m-%Y")
-            else:
-                date_obj = attendance_data["date"]
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid date format: {e}")
-        
-        # Create attendance record
-        attendance = DriverAttendance(
-            driver_id=attendance_data["driver_id"],
-            date=date_obj,
-            check_in=attendance_data.get("check_in_time"),
-            check_out=attendance_data.get("check_out_time"),
-            status=attendance_data.get("status", "present")
-        )
-        
-        await attendance.insert()
-        
-        return {
-            "status": "success",
-            "message": "Attendance record created successfully",
-            "attendance": {
-                "id": str(attendance.id),
-                "driver_id": str(attendance.driver_id),
-                "date": attendance.date.isoformat() if attendance.date else None,
-                "status": attendance.status
-            }
-        }
-    except Exception as e:
-        print(f"❌ Error creating attendance: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    # Create attendance record
+    attendance = build_attendance_record(attendance_data)
+    await attendance.insert()
+    await invalidate_cache("debug:attendance")
+    
+    return {
+        "status": "success",
+        "message": "Attendance record created successfully",
+        "attendance": attendance_summary(attendance)
+    }
+
+@app.post("/attendance/bulk")
+async def create_attendance_bulk(attendance_data_list: List[AttendanceCreate], current_user: User = Depends(get_current_admin)):
+    """Create many attendance records in one insert (admin only)"""
+    # FastAPI has already validated every record, so nothing is written on bad input
+    records = [build_attendance_record(attendance_data) for attendance_data in attendance_data_list]
+    if records:
+        await DriverAttendance.insert_many(records)
+        await invalidate_cache("debug:attendance")
+    
+    return {
+        "status": "success",
+        "message": f"{len(records)} attendance records created successfully",
+        "attendance": [attendance_summary(record) for record in records],
+        "total": len(records)
+    }
+
+# Update payload field -> DriverAttendance field
+ATTENDANCE_UPDATE_FIELDS = {"check_in_time": "check_in", "check_out_time": "check_out", "status": "status"}
 
 @app.put("/attendance/{attendance_id}")
 async def update_attendance(
-    attendance_id: str,
-    attendance_data: dict,
+    attendance_id: uuid.UUID,
+    attendance_data: AttendanceUpdate,
     current_user: User = Depends(get_current_admin)
 ):
     """Update attendance record (admin only)"""
-    try:
-        attendance = await DriverAttendance.find_one({"_id": attendance_id})
-        if not attendance:
-            raise HTTPException(status_code=404, detail="Attendance record not found")
-        
-        # Update fields
-        if "check_in_time" in attendance_data:
-            attendance.check_in = attendance_data["check_in_time"]
-        if "check_out_time" in attendance_data:
-            attendance.check_out = attendance_data["check_out_time"]
-        if "status" in attendance_data:
-            attendance.status = attendance_data["status"]
-        
-        await attendance.save()
-        
-        return {
-            "status": "success",
-            "message": "Attendance record updated successfully",
-            "attendance": {
-                "id": str(attendance.id),
-                "driver_id": str(attendance.driver_id),
-                "date": attendance.date.isoformat() if attendance.date else None,
-                "status": attendance.status
-            }
+    updates = {
+        ATTENDANCE_UPDATE_FIELDS[key]: value
+        for key, value in attendance_data.model_dump(exclude_unset=True).items()
+    }
+    
+    # $set just the changed fields and read back the result in one round trip
+    collection = DriverAttendance.get_motor_collection()
+    summary_fields = {"driver_id": 1, "date": 1, "status": 1}
+    if updates:
+        attendance = await collection.find_one_and_update(
+            {"_id": str(attendance_id)},
+            {"$set": updates},
+            projection=summary_fields,
+            return_document=ReturnDocument.AFTER
+        )
+    else:
+        attendance = await collection.find_one({"_id": str(attendance_id)}, summary_fields)
+    if not attendance:
+        raise HTTPException(status_code=404, detail="Attendance record not found")
+    
+    if updates:
+        await invalidate_cache("debug:attendance")
+    
+    return {
+        "status": "success",
+        "message": "Attendance record updated successfully",
+        "attendance": {
+            "id": attendance["_id"],
+            "driver_id": attendance.get("driver_id"),
+            "date": attendance.get("date"),
+            "status": attendance.get("status")
         }
-    except Exception as e:
-        print(f"❌ Error updating attendance: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    }
 
 @app.delete("/attendance/{attendance_id}")
 async def delete_attendance(
-    attendance_id: str,
+    attendance_id: uuid.UUID,
     current_user: User = Depends(get_current_admin)
 ):
     """Delete attendance record (admin only)"""
-    try:
-        attendance = await DriverAttendance.find_one({"_id": attendance_id})
-        if not attendance:
-            raise HTTPException(status_code=404, detail="Attendance record not found")
-        
-        await attendance.delete()
-        
-        return {
-            "status": "success",
-            "message": "Attendance record deleted successfully"
-        }
-    except Exception as e:
-        print(f"❌ Error deleting attendance: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    # One delete_one; deleted_count tells us whether the record existed
+    result = await DriverAttendance.get_motor_collection().delete_one({"_id": str(attendance_id)})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Attendance record not found")
+    
+    await invalidate_cache("debug:attendance")
+    
+    return {
+        "status": "success",
+        "message": "Attendance record deleted successfully"
+    }
+
+# Joins each attendance record with its driver's user name in one round-trip
+DEBUG_ATTENDANCE_PIPELINE = [
+    {"$lookup": {"from": "drivers", "localField": "driver_id", "foreignField": "_id", "as": "driver"}},
+    {"$addFields": {"driver": {"$arrayElemAt": ["$driver", 0]}}},
+    {"$lookup": {"from": "users", "localField": "driver.user_id", "foreignField": "_id", "as": "driver_user"}},
+    {"$project": {
+        "driver_id": 1, "date": 1, "check_in": 1, "check_out": 1, "status": 1, "notes": 1,
+        "driver_name": {"$ifNull": [{"$arrayElemAt": ["$driver_user.name", 0]}, "Unknown"]}
+    }}
+]
 
 # Debug attendance endpoint
 @app.get("/debug/attendance")
 async def debug_attendance():
     """Debug endpoint to get all attendance records without authentication"""
-    try:
-        attendance_records = await DriverAttendance.find_all().to_list()
-        
-        attendance_list = []
-        for record in attendance_records:
-            try:
-                driver = await Driver.find_one({"_id": record.driver_id})
-                user = None
-                if driver:
-                    user = await User.find_one({"_id": driver.user_id})
-                
-                attendance_data = {
-                    "id": str(record.id),
-                    "driver_id": str(record.driver_id),
-                    "driver_name": user.name if user else "Unknown",
-                    "date": record.date.isoformat() if record.date else None,
-                    "check_in_time": record.check_in.isoformat() if record.check_in else None,
-                    "check_out_time": record.check_out.isoformat() if record.check_out else None,
-                    "status": record.status,
-                    "notes": record.notes if hasattr(record, 'notes') else None
-                }
-                attendance_list.append(attendance_data)
-            except Exception as e:
-                print(f"❌ Error processing attendance record {record.id}: {e}")
-                continue
-        
-        return {
-            "status": "success",
-            "attendance": attendance_list,
-            "total": len(attendance_list)
-        }
-    except Exception as e:
-        print(f"❌ Error fetching attendance: {e}")
-        return {"status": "error", "message": str(e)}
+    cached = await get_cached("debug:attendance")
+    if cached:
+        return cached_json(cached)
+    
+    # Records are shaped by AttendanceOut and encoded as the aggregation
+    # cursor yields them
+    attendance_list = (
+        AttendanceOut.model_validate(record).model_dump()
+        async for record in DriverAttendance.aggregate(DEBUG_ATTENDANCE_PIPELINE)
+    )
+    
+    return await stream_json_cached("debug:attendance", "attendance", attendance_list, with_total=True)
 
 # Debug endpoint to check user authentication
 @app.get("/debug/user-auth")
 async def debug_user_auth(current_user: User = Depends(get_current_user)):
     """Debug endpoint to check current user authentication and role"""
-    try:
-        print(f"🔍 Debug user-auth called for user: {current_user.id}")
-        print(f"🔍 User role: {current_user.role}")
-        print(f"🔍 User name: {current_user.name}")
-        print(f"🔍 User email: {current_user.email}")
-        
-        # Check if user has corresponding profile
-        if current_user.role == "passenger":
-            passenger = await Passenger.find_one({"user_id": current_user.id})
-            print(f"🔍 Passenger profile found: {passenger is not None}")
-            if passenger:
-                print(f"🔍 Passenger ID: {passenger.id}")
-        elif current_user.role == "driver":
-            driver = await Driver.find_one({"user_id": current_user.id})
-            print(f"🔍 Driver profile found: {driver is not None}")
-            if driver:
-                print(f"🔍 Driver ID: {driver.id}")
-        
-        return {
-            "status": "success",
-            "user": {
-                "id": current_user.id,
-                "name": current_user.name,
-                "email": current_user.email,
-                "role": current_user.role
-            }
+    logger.debug("🔍 Debug user-auth called for user: %s", current_user.id)
+    logger.debug("🔍 User role: %s", current_user.role)
+    logger.debug("🔍 User name: %s", current_user.name)
+    logger.debug("🔍 User email: %s", current_user.email)
+    
+    # Check if user has corresponding profile
+    if current_user.role == "passenger":
+        passenger = await Passenger.find_one({"user_id": current_user.id})
+        logger.debug("🔍 Passenger profile found: %s", passenger is not None)
+        if passenger:
+            logger.debug("🔍 Passenger ID: %s", passenger.id)
+    elif current_user.role == "driver":
+        driver = await Driver.find_one({"user_id": current_user.id})
+        logger.debug("🔍 Driver profile found: %s", driver is not None)
+        if driver:
+            logger.debug("🔍 Driver ID: %s", driver.id)
+    
+    return {
+        "status": "success",
+        "user": {
+            "id": current_user.id,
+            "name": current_user.name,
+            "email": current_user.email,
+            "role": current_user.role
         }
-    except Exception as e:
-        print(f"❌ Error in debug user-auth: {e}")
-        return {"status": "error", "message": str(e)}
+    }
 
 @app.post("/debug/create-admin")
 async def debug_create_admin(admin_data: dict):
     """Create an admin user without authentication (for testing)"""
+    logger.debug("🔧 Debug: Creating admin %s", admin_data.get("email"))
+    
+    # The shared default applies only when no password is given at all; bcrypt
+    # is CPU-bound, so a custom one is hashed off the event loop
+    password = admin_data.get("password")
+    if password is None:
+        password_hash = DEFAULT_PASSWORD_HASH
+    elif not password:
+        return {"status": "error", "message": "Password must not be empty"}
+    else:
+        password_hash = await run_in_threadpool(get_password_hash, password)
+    
+    # Create admin user
+    new_user = User(
+        name=admin_data.get("name", "Admin User"),
+        email=admin_data.get("email"),
+        phone=admin_data.get("phone", "+1234567890"),
+        role="admin",
+        password_hash=password_hash
+    )
+    # The unique email index rejects duplicates, without a racy pre-check
     try:
-        print(f"🔧 Debug: Creating admin with data: {admin_data}")
-        
-        # Check if user with this email already exists
-        existing_user = await User.find_one({"email": admin_data.get("email")})
-        if existing_user:
-            return {"status": "error", "message": "User with this email already exists"}
-        
-        # Create admin user
-        new_user = User(
-            name=admin_data.get("name", "Admin User"),
-            email=admin_data.get("email"),
-            phone=admin_data.get("phone", "+1234567890"),
-            role="admin",
-            password_hash=get_password_hash(admin_data.get("password", "password"))
-        )
         await new_user.insert()
-        
-        # Create admin profile
-        admin_profile = Admin(
-            user_id=new_user.id,
-            permissions=admin_data.get("permissions", '["view_all", "manage_drivers", "manage_rides", "manage_passengers"]')
-        )
+    except DuplicateKeyError:
+        return {"status": "error", "message": "User with this email already exists"}
+    
+    # Create admin profile; don't leave an orphaned user if that fails
+    admin_profile = Admin(
+        user_id=new_user.id,
+        permissions=admin_data.get("permissions", '["view_all", "manage_drivers", "manage_rides", "manage_passengers"]')
+    )
+    try:
         await admin_profile.insert()
-        
-        print(f"✅ Debug: Admin created successfully - {new_user.name}")
-        return {
-            "status": "success",
-            "message": "Admin created successfully!",
-            "admin": {
-                "id": admin_profile.id,
-                "user_id": admin_profile.user_id,
-                "user": {
-                    "id": new_user.id,
-                    "name": new_user.name,
-                    "email": new_user.email,
-                    "role": new_user.role
-                }
+    except Exception:
+        await new_user.delete()
+        raise
+    await invalidate_cache()
+    
+    logger.debug("✅ Debug: Admin created successfully - %s", new_user.name)
+    return {
+        "status": "success",
+        "message": "Admin created successfully!",
+        "admin": {
+            "id": admin_profile.id,
+            "user_id": admin_profile.user_id,
+            "user": {
+                "id": new_user.id,
+                "name": new_user.name,
+                "email": new_user.email,
+                "role": new_user.role
             }
         }
-    except Exception as e:
-        print(f"❌ Debug: Error creating admin: {e}")
-        return {"status": "error", "message": str(e)}
+    }
 
 # Debug passenger rides endpoint
 @app.get("/debug/passenger-rides/{passenger_id}")
-async def debug_passenger_rides(passenger_id: str):
+async def debug_passenger_rides(passenger_id: uuid.UUID):
     """Debug endpoint to get rides for a specific passenger without authentication"""
-    try:
-        print(f"🔍 Debug: Looking for rides with passenger_id: {passenger_id}")
-        
-        # Get all rides
-        all_rides = await Ride.find_all().to_list()
-        print(f"🔍 Debug: Found {len(all_rides)} total rides")
-        
-        # Filter rides for this passenger
-        passenger_rides = [ride for ride in all_rides if str(ride.passenger_id) == passenger_id]
-        print(f"🔍 Debug: Found {len(passenger_rides)} rides for passenger {passenger_id}")
-        
-        # Get passenger info
-        passenger = await Passenger.find_one({"_id": passenger_id})
-        passenger_user = None
-        if passenger:
-            passenger_user = await User.find_one({"_id": passenger.user_id})
-            print(f"🔍 Debug: Passenger found - {passenger_user.name if passenger_user else 'Unknown'}")
-            print(f"🔍 Debug: Passenger user_id: {passenger.user_id}")
-            print(f"🔍 Debug: Passenger user found: {passenger_user is not None}")
-        else:
-            print(f"🔍 Debug: Passenger not found for ID: {passenger_id}")
-            # Let's check all passengers to see what's available
-            all_passengers = await Passenger.find_all().to_list()
-            print(f"🔍 Debug: Total passengers in database: {len(all_passengers)}")
-            for p in all_passengers:
-                print(f"🔍 Debug: Available passenger: {p.id}, user_id: {p.user_id}")
-        
-        # Format rides for response
-        rides_list = []
-        for ride in passenger_rides:
-            try:
-                # Get driver info if assigned
-                driver = None
-                driver_user = None
-                if ride.driver_id:
-                    driver = await Driver.find_one({"_id": ride.driver_id})
-                    if driver:
-                        driver_user = await User.find_one({"_id": driver.user_id})
-                
-                ride_data = {
-                    "id": str(ride.id),
-                    "passenger_id": str(ride.passenger_id),
-                    "driver_id": str(ride.driver_id) if ride.driver_id else None,
-                    "status": ride.status.value if ride.status else "unknown",
-                    "pickup_address": ride.pickup_address,
-                    "dropoff_address": ride.dropoff_address,
-                    "requested_at": ride.requested_at.isoformat() if ride.requested_at else None,
-                    "assigned_at": ride.assigned_at.isoformat() if ride.assigned_at else None,
-                    "picked_up_at": ride.picked_up_at.isoformat() if ride.picked_up_at else None,
-                    "completed_at": ride.completed_at.isoformat() if ride.completed_at else None,
-                    "distance": ride.distance,
-                    "passenger": {
-                        "id": str(passenger.id) if passenger else None,
-                        "user": {
-                            "id": str(passenger_user.id) if passenger_user else None,
-                            "name": passenger_user.name if passenger_user else "Unknown",
-                            "email": passenger_user.email if passenger_user else "No email"
-                        }
-                    },
-                    "driver": {
-                        "id": str(driver.id) if driver else None,
-                        "user": {
-                            "id": str(driver_user.id) if driver_user else None,
-                            "name": driver_user.name if driver_user else "Unknown",
-                            "email": driver_user.email if driver_user else "No email"
-                        }
-                    } if driver else None
-                }
-                rides_list.append(ride_data)
-            except Exception as e:
-                print(f"❌ Error processing ride {ride.id}: {e}")
-                continue
-        
-        return {
-            "status": "success",
-            "passenger_id": passenger_id,
-            "passenger_name": passenger_user.name if passenger_user else "Unknown",
-            "rides": rides_list,
-            "total": len(rides_list)
+    logger.debug("🔍 Debug: Looking for rides with passenger_id: %s", passenger_id)
+    
+    # The passenger and their rides (via the passenger_id index) are independent
+    passenger_rides, passenger = await asyncio.gather(
+        Ride.find({"passenger_id": str(passenger_id)}).project(RideSummaryView).to_list(),
+        Passenger.find_one({"_id": str(passenger_id)}).project(ProfileUserView)
+    )
+    logger.debug("🔍 Debug: Found %s rides for passenger %s", len(passenger_rides), passenger_id)
+    
+    # Fetch the assigned drivers, then their users and the passenger's user
+    # together, in two batched queries
+    driver_ids = list({ride.driver_id for ride in passenger_rides if ride.driver_id})
+    drivers_by_id = {d.id: d for d in await Driver.find({"_id": {"$in": driver_ids}}).project(ProfileUserView).to_list()}
+    user_ids = [d.user_id for d in drivers_by_id.values()]
+    if passenger:
+        user_ids.append(passenger.user_id)
+    users_by_id = {u.id: u for u in await User.find({"_id": {"$in": user_ids}}).project(UserSimpleView).to_list()}
+    
+    passenger_user = None
+    if passenger:
+        passenger_user = users_by_id.get(passenger.user_id)
+        logger.debug("🔍 Debug: Passenger found - %s", passenger_user.name if passenger_user else 'Unknown')
+        logger.debug("🔍 Debug: Passenger user_id: %s", passenger.user_id)
+        logger.debug("🔍 Debug: Passenger user found: %s", passenger_user is not None)
+    else:
+        logger.debug("🔍 Debug: Passenger not found for ID: %s", passenger_id)
+        if settings.DEBUG:
+            logger.debug("🔍 Debug: Total passengers in database: %s", await Passenger.find_all().count())
+    
+    # Every ride shares the same passenger block, and rides only reference a
+    # handful of drivers, so build those once rather than per ride
+    passenger_block = {
+        "id": passenger.id if passenger else None,
+        "user": {
+            "id": passenger_user.id if passenger_user else None,
+            "name": passenger_user.name if passenger_user else "Unknown",
+            "email": passenger_user.email if passenger_user else "No email"
         }
-    except Exception as e:
-        print(f"❌ Error fetching passenger rides: {e}")
-        return {"status": "error", "message": str(e)}
+    }
+    driver_blocks = {}
+    for driver in drivers_by_id.values():
+        driver_user = users_by_id.get(driver.user_id)
+        driver_blocks[driver.id] = {
+            "id": driver.id,
+            "user": {
+                "id": driver_user.id if driver_user else None,
+                "name": driver_user.name if driver_user else "Unknown",
+                "email": driver_user.email if driver_user else "No email"
+            }
+        }
+    
+    # Format rides for response
+    rides_list = [
+        {
+            "id": ride.id,
+            "passenger_id": ride.passenger_id,
+            "driver_id": ride.driver_id or None,
+            "status": ride.status,
+            "pickup_address": ride.pickup_address,
+            "dropoff_address": ride.dropoff_address,
+            "requested_at": ride.requested_at,
+            "assigned_at": ride.assigned_at,
+            "picked_up_at": ride.picked_up_at,
+            "completed_at": ride.completed_at,
+            "distance": ride.distance,
+            "passenger": passenger_block,
+            "driver": driver_blocks.get(ride.driver_id)
+        }
+        for ride in passenger_rides
+    ]
+    
+    return json_ok({
+        "passenger_id": passenger_id,
+        "passenger_name": passenger_user.name if passenger_user else "Unknown",
+        "rides": rides_list,
+        "total": len(rides_list)
+    })
 
 # Railway deployment
 if __name__ == "__main__":
@@ -1633,5 +1584,9 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=port,
         reload=False,  # Disable reload in production
-        log_level="info"
+        log_level="info",
+        loop="uvloop",
+        http="httptools",
+        # setdefault so the worker processes see it and size their pools to match
+        workers=int(os.environ.setdefault("WEB_CONCURRENCY", "2"))
     ) 
@@ -1,9 +1,11 @@
 from beanie import Document, Indexed
-from pydantic import BaseModel, Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
 import uuid
+from utils import parse_date
 
 # Enums
 class UserRole(str, Enum):
@@ -29,7 +31,7 @@ class LeaveRequestStatus(str, Enum):
 class User(Document):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     name: str = Indexed(str)
-    email: str = Indexed(str, unique=True)
+    email: str
     phone: str = Indexed(str)
     role: UserRole
     password_hash: str
@@ -40,6 +42,8 @@ class User(Document):
     class Settings:
         name = "users"
         indexes = [
+            # Lookup index; uniqueness is enforced separately by
+            # database.ensure_unique_email_index once duplicates are gone
             "email",
             "role",
             "created_at",
@@ -89,18 +93,8 @@ class Driver(Document):
     async def create_driver(cls, **data):
         """Create driver with proper datetime handling"""
         if isinstance(data.get('license_expiry'), str):
-            # Handle DD-MM-YYYY format
-            if '-' in data['license_expiry'] and len(data['license_expiry'].split('-')) == 3:
-                try:
-                    # Parse DD-MM-YYYY format
-                    day, month, year = data['license_expiry'].split('-')
-                    data['license_expiry'] = datetime(int(year), int(month), int(day))
-                except ValueError:
-                    # Try ISO format as fallback
-                    data['license_expiry'] = datetime.fromisoformat(data['license_expiry'].replace('Z', '+00:00'))
-            else:
-                # Try ISO format
-                data['license_expiry'] = datetime.fromisoformat(data['license_expiry'].replace('Z', '+00:00'))
+            # Accepts DD-MM-YYYY or ISO format
+            data['license_expiry'] = parse_date(data['license_expiry'])
         return await cls(**data).insert()
 
 class Passenger(Document):
@@ -163,7 +157,11 @@ class Ride(Document):
             "picked_up_at",
             "completed_at",
             "cancelled_at",
-            "distance"
+            "distance",
+            # Assigned-rides lookup: driver_id + status filter
+            IndexModel([("driver_id", ASCENDING), ("status", ASCENDING)]),
+            # Rides in one status, newest requests first (pending queue)
+            IndexModel([("status", ASCENDING), ("requested_at", DESCENDING)])
         ]
 
 class KilometerEntry(Document):
@@ -239,7 +237,9 @@ class DriverAttendance(Document):
         indexes = [
             "driver_id",
             "date",
-            "status"
+            "status",
+            # Per-driver attendance filtered by date range, newest first
+            IndexModel([("driver_id", ASCENDING), ("date", DESCENDING)])
         ]
 
 class Vehicle(Document):
@@ -267,6 +267,88 @@ class Vehicle(Document):
             "updated_at"
         ]
 
+# Projection models (partial documents loaded with .project())
+class UserNameView(BaseModel):
+    id: str = Field(alias="_id")
+    name: str
+
+class UserSimpleView(BaseModel):
+    id: str = Field(alias="_id")
+    name: str
+    email: str
+    phone: str
+    role: UserRole
+
+class UserSafeView(BaseModel):
+    """Every User field except password_hash"""
+    id: str = Field(alias="_id")
+    name: str
+    email: str
+    phone: str
+    role: UserRole
+    avatar: Optional[str] = None
+    created_at: datetime
+    is_active: bool = True
+
+class ProfileUserView(BaseModel):
+    """Just the keys of a driver or passenger profile"""
+    id: str = Field(alias="_id")
+    user_id: str
+
+class DriverSummaryView(BaseModel):
+    id: str = Field(alias="_id")
+    user_id: str
+    vehicle_make: str
+    license_plate: str
+
+class DriverListView(BaseModel):
+    id: str = Field(alias="_id")
+    user_id: str
+    vehicle_make: str
+    vehicle_model: str
+    vehicle_year: int
+    license_plate: str
+    vehicle_color: str
+    license_number: str
+    license_expiry: datetime
+    rating: float = 5.0
+    total_rides: int = 0
+    current_km_reading: int = 0
+    is_online: bool = False
+    # Not on the Driver model, but present on older documents
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class FuelEntryView(BaseModel):
+    id: str = Field(alias="_id")
+    driver_id: str
+    amount: float
+    cost: float
+    location: str
+    date: Optional[datetime] = None
+
+class AttendanceView(BaseModel):
+    id: str = Field(alias="_id")
+    driver_id: str
+    date: Optional[datetime] = None
+    check_in: Optional[datetime] = None
+    check_out: Optional[datetime] = None
+    status: str = "present"
+    notes: Optional[str] = None
+
+class RideSummaryView(BaseModel):
+    id: str = Field(alias="_id")
+    passenger_id: str
+    driver_id: Optional[str] = None
+    status: RideStatus
+    pickup_address: str
+    dropoff_address: str
+    requested_at: Optional[datetime] = None
+    assigned_at: Optional[datetime] = None
+    picked_up_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    distance: float = 0.0
+
 # Pydantic models for API responses
 class UserResponse(BaseModel):
     id: str
@@ -325,4 +407,74 @@ class RideResponse(BaseModel):
     estimated_duration: int
     actual_duration: Optional[int] = None
     passenger: Optional[PassengerResponse] = None
-    driver: Optional[DriverResponse] = None 
\ No newline at end of file
+    driver: Optional[DriverResponse] = None
+
+# Ride detail models (validated straight from the ride details aggregation,
+# where ids arrive as "_id" and are dumped back out as "id")
+class RideDetailUser(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    
+    id: str = Field(alias="_id")
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    role: Optional[UserRole] = None
+    avatar: Optional[str] = None
+    created_at: Optional[datetime] = None
+    is_active: Optional[bool] = None
+
+class RideDetailPassenger(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    
+    id: str = Field(alias="_id")
+    user_id: Optional[str] = None
+    rating: float = 0.0
+    total_rides: int = 0
+    user: Optional[RideDetailUser] = None
+
+class RideDetailDriver(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    
+    id: str = Field(alias="_id")
+    user_id: Optional[str] = None
+    vehicle_make: Optional[str] = None
+    vehicle_model: Optional[str] = None
+    license_plate: Optional[str] = None
+    is_online: bool = False
+    user: Optional[RideDetailUser] = None
+
+class RideDetailOut(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    
+    id: str = Field(alias="_id")
+    passenger_id: str
+    driver_id: Optional[str] = None
+    status: RideStatus
+    pickup_latitude: float
+    pickup_longitude: float
+    pickup_address: str
+    dropoff_latitude: float
+    dropoff_longitude: float
+    dropoff_address: str
+    requested_at: datetime
+    assigned_at: Optional[datetime] = None
+    picked_up_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    distance: float = 0.0
+    start_km: Optional[int] = None
+    end_km: Optional[int] = None
+    passenger: Optional[RideDetailPassenger] = None
+    driver: Optional[RideDetailDriver] = None
+
+class AttendanceOut(BaseModel):
+    """An attendance record as listed, renaming the stored check_in/check_out"""
+    model_config = ConfigDict(populate_by_name=True)
+    
+    id: str = Field(alias="_id")
+    driver_id: Optional[str] = None
+    driver_name: str = "Unknown"
+    date: Optional[datetime] = None
+    check_in_time: Optional[datetime] = Field(default=None, alias="check_in")
+    check_out_time: Optional[datetime] = Field(default=None, alias="check_out")
+    status: Optional[str] = None
+    notes: Optional[str] = None 
\ No newline at end of file
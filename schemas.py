@@ -1,7 +1,14 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, BeforeValidator, ConfigDict, EmailStr, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Annotated, Optional, List
 from enum import Enum
+from utils import parse_date
+
+# Datetime input that also accepts the DD-MM-YYYY strings the admin app sends
+InputDate = Annotated[datetime, BeforeValidator(lambda value: parse_date(value) if isinstance(value, str) else value)]
+
+# Required text that may not be blank
+NonEmptyStr = Annotated[str, Field(min_length=1)]
 
 # Enums
 class UserRole(str, Enum):
@@ -88,6 +95,18 @@ class DriverCreateAdmin(BaseModel):
     license_number: str
     license_expiry: str
 
+class VehicleCreate(BaseModel):
+    # Blank strings count as missing
+    model_config = ConfigDict(str_min_length=1)
+
+    vehicle_make: str
+    vehicle_model: str
+    vehicle_year: int
+    license_plate: str
+    vehicle_color: str
+    license_number: str
+    license_expiry: InputDate
+
 class Driver(DriverBase):
     id: str
     user_id: str
@@ -205,6 +224,19 @@ class FuelEntryBase(BaseModel):
 class FuelEntryCreate(FuelEntryBase):
     driver_id: str
 
+class DriverFuelEntryCreate(FuelEntryBase):
+    location: NonEmptyStr
+    amount: float = Field(gt=0)
+    cost: float = Field(gt=0)
+    date: Optional[str] = None  # unparseable dates fall back to now
+
+class AdminFuelEntryCreate(BaseModel):
+    driver_id: NonEmptyStr
+    fuel_amount: float = Field(gt=0)
+    fuel_cost: float = Field(gt=0)
+    fuel_station: str = "Unknown"
+    date: Optional[str] = None  # unparseable dates fall back to now
+
 class FuelEntry(FuelEntryBase):
     id: str
     driver_id: str
@@ -271,6 +303,20 @@ class DriverAttendanceCreate(BaseModel):
 class DriverAttendanceUpdate(BaseModel):
     end_time: datetime
 
+class AttendanceTimes(BaseModel):
+    # Shared by create and update so both accept the same time formats
+    check_in_time: Optional[InputDate] = None
+    check_out_time: Optional[InputDate] = None
+
+class AttendanceCreate(AttendanceTimes):
+    driver_id: str
+    date: InputDate
+    status: str = "present"
+
+class AttendanceUpdate(AttendanceTimes):
+    # Only the fields present in the request are changed
+    status: Optional[str] = None
+
 class DashboardStats(BaseModel):
     total_drivers: int
     active_drivers: int
@@ -0,0 +1,13 @@
+import re
+from datetime import datetime
+
+# DD-MM-YYYY, the format the admin app sends dates in
+_DD_MM_YYYY = re.compile(r"(\d{1,2})-(\d{1,2})-(\d{4})$")
+
+def parse_date(value: str) -> datetime:
+    """Parse a DD-MM-YYYY or ISO 8601 date string, raising ValueError if it is neither"""
+    match = _DD_MM_YYYY.match(value)
+    if match:
+        day, month, year = match.groups()
+        return datetime(int(year), int(month), int(day))
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))